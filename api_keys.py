@@ -0,0 +1,125 @@
+from datetime import datetime
+import atexit
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import bindparam, or_
+
+from models import db, ApiKey
+
+logger = logging.getLogger(__name__)
+
+
+class ApiKeyCache:
+    """활성 API 키 캐시 + last_used_at 지연 기록(write-behind)
+
+    키 조회는 메모리에서 처리하고, 사용 시각은 키별로 마지막 값만 모아
+    flush_interval마다 한 번에 UPDATE 한다. 다른 워커에서 생성/삭제된 키는
+    refresh_interval 이내에 반영된다.
+    """
+
+    def __init__(self, app=None, refresh_interval=60, flush_interval=30):
+        self.app = None
+        self.refresh_interval = refresh_interval
+        self.flush_interval = flush_interval
+        self._keys = {}
+        self._quotas = {}
+        self._loaded_at = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.refresh_interval = app.config.get('API_KEY_CACHE_REFRESH', self.refresh_interval)
+        self.flush_interval = app.config.get('API_KEY_FLUSH_INTERVAL', self.flush_interval)
+        atexit.register(self._shutdown)
+
+    def reload(self):
+        """활성 키 목록 다시 읽기 (키 생성/삭제 시 호출)"""
+        rows = db.session.query(ApiKey.key, ApiKey.id, ApiKey.rate_limit).filter_by(is_active=True).all()
+        with self._lock:
+            self._keys = {key: key_id for key, key_id, _ in rows}
+            self._quotas = {key_id: rate_limit for _, key_id, rate_limit in rows if rate_limit}
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        """다음 조회에서 키 목록 다시 읽기"""
+        with self._lock:
+            self._loaded_at = None
+
+    def resolve(self, key):
+        """API 키 문자열 -> ApiKey.id (비활성/미등록이면 None)"""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_interval:
+            self.reload()
+        return self._keys.get(key)
+
+    def quota(self, key_id):
+        """키별 rate limit 문자열 (없으면 None - 기본값 사용)"""
+        return self._quotas.get(key_id)
+
+    def touch(self, key_id):
+        """키 사용 시각 기록 (DB 반영은 flush에서)"""
+        with self._lock:
+            self._pending[key_id] = datetime.utcnow()
+        self._ensure_flusher()
+
+    def flush(self):
+        """모아둔 last_used_at을 키당 UPDATE 1회로 반영"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        table = ApiKey.__table__
+        stmt = table.update().where(
+            table.c.id == bindparam('key_id'),
+            or_(table.c.last_used_at.is_(None), table.c.last_used_at < bindparam('used_at'))
+        ).values(last_used_at=bindparam('used_at'))
+        params = [{'key_id': key_id, 'used_at': used_at} for key_id, used_at in pending.items()]
+        try:
+            db.session.execute(stmt, params)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"API key last_used_at flush failed: {str(e)}")
+            # 다음 flush에서 다시 시도 (그 사이 더 최근 값이 있으면 유지)
+            with self._lock:
+                for key_id, used_at in pending.items():
+                    self._pending.setdefault(key_id, used_at)
+            return 0
+        return len(params)
+
+    def _ensure_flusher(self):
+        # fork(--preload) 이후에는 스레드가 복제되지 않으므로 워커별로 시작
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='api-key-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self._flush_in_context()
+
+    def _flush_in_context(self):
+        if self.app is None:
+            return
+        with self.app.app_context():
+            try:
+                self.flush()
+            finally:
+                db.session.remove()
+
+    def _shutdown(self):
+        if self._pending:
+            self._flush_in_context()
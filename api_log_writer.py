@@ -0,0 +1,166 @@
+from datetime import datetime
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from models import db, ApiLog, ApiUsageHourly
+
+logger = logging.getLogger(__name__)
+
+# executemany는 모든 행의 키가 같아야 하므로 컬럼 목록으로 정규화
+_COLUMNS = [column.name for column in ApiLog.__table__.columns if column.name != 'id']
+
+
+class ApiLogWriter:
+    """ApiLog 비동기 일괄 기록기 (워커별)
+
+    요청 스레드는 큐에 행을 넣기만 하고, 백그라운드 스레드가
+    batch_size 행 또는 flush_interval_ms 마다 한 번의 INSERT로 기록하고
+    ApiUsageHourly 집계를 함께 갱신한다.
+    큐가 가득 차면 policy에 따라 버리거나('drop') block_timeout 만큼 기다린다('block').
+    기록된 배치는 monitor(UsageMonitor)에 넘겨 사용량/오류율을 감시한다.
+    """
+
+    def __init__(self, app=None, monitor=None, max_queue=10000, batch_size=200,
+                 flush_interval_ms=500, policy='drop', block_timeout=1.0):
+        self.app = None
+        self.monitor = monitor
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval_ms = flush_interval_ms
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self._queue = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.max_queue = app.config.get('API_LOG_QUEUE_SIZE', self.max_queue)
+        self.batch_size = app.config.get('API_LOG_BATCH_SIZE', self.batch_size)
+        self.flush_interval_ms = app.config.get('API_LOG_FLUSH_MS', self.flush_interval_ms)
+        self.policy = app.config.get('API_LOG_FULL_POLICY', self.policy)
+        self.block_timeout = app.config.get('API_LOG_BLOCK_TIMEOUT', self.block_timeout)
+        if self.policy not in ('drop', 'block'):
+            raise ValueError(f"API_LOG_FULL_POLICY must be 'drop' or 'block': {self.policy}")
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        atexit.register(self.drain)
+
+    def submit(self, **row):
+        """로그 한 건 큐에 추가 (큐가 가득 차서 버려지면 False)"""
+        row.setdefault('timestamp', datetime.utcnow())
+        row = {column: row.get(column) for column in _COLUMNS}
+        self._ensure_worker()
+        try:
+            if self.policy == 'block':
+                self._queue.put(row, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def drain(self, timeout=10):
+        """남은 로그를 모두 기록하고 백그라운드 스레드 종료 (워커 종료 시)"""
+        if self._queue is None:
+            return
+        self._stop.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout)
+        # 스레드가 없거나 시간 안에 끝나지 않았으면 현재 스레드에서 마저 기록
+        self._write_pending()
+
+    def stats(self):
+        return {
+            'queued': self._queue.qsize() if self._queue else 0,
+            'max_queue': self.max_queue,
+            'batch_size': self.batch_size,
+            'flush_interval_ms': self.flush_interval_ms,
+            'policy': self.policy,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed
+        }
+
+    def _ensure_worker(self):
+        # fork(--preload) 이후에는 스레드가 복제되지 않으므로 워커별로 시작
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='api-log-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        interval = self.flush_interval_ms / 1000.0
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=interval)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.monotonic() + interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+        self._write_pending()
+
+    def _write_pending(self):
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self._write(batch)
+
+    def _write(self, batch):
+        if self.app is None:
+            return
+        with self.app.app_context():
+            try:
+                db.session.execute(ApiLog.__table__.insert(), batch)
+                # 시간 단위 집계도 같은 트랜잭션에서 갱신
+                ApiUsageHourly.record(batch)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                with self._lock:
+                    self.failed += len(batch)
+                logger.error(f"ApiLog batch insert failed ({len(batch)} rows): {str(e)}")
+                db.session.remove()
+                return
+            with self._lock:
+                self.written += len(batch)
+            try:
+                if self.monitor is not None:
+                    self.monitor.process(batch)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"API usage check failed: {str(e)}")
+            finally:
+                db.session.remove()
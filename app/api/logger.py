@@ -0,0 +1,130 @@
+from datetime import datetime
+import asyncio
+import logging
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.database import database, metadata, settings
+from log_policy import PayloadPolicy, parse_policies
+from models import ApiUsageHourly
+
+logger = logging.getLogger(__name__)
+
+api_log_table = metadata.tables['api_log']
+api_usage_hourly_table = metadata.tables['api_usage_hourly']
+
+# executemany는 모든 행의 키가 같아야 하므로 컬럼 목록으로 정규화
+_COLUMNS = [column.name for column in api_log_table.columns if column.name != 'id']
+
+
+def _usage_upsert():
+    """ApiUsageHourly 증가 (Flask 앱의 ApiUsageHourly.record와 같은 ON CONFLICT)"""
+    if database.url.dialect == 'postgresql':
+        insert = postgresql.insert(api_usage_hourly_table)
+    else:
+        insert = sqlite.insert(api_usage_hourly_table)
+    table = api_usage_hourly_table
+    return insert.on_conflict_do_update(
+        index_elements=[table.c.hour, table.c.api_key_id, table.c.endpoint, table.c.status_code],
+        set_={'count': table.c.count + insert.excluded['count']}
+    )
+
+
+class AsyncApiLogWriter:
+    """ApiLog 비동기 일괄 기록 (Flask 앱의 ApiLogWriter와 같은 방식, 이벤트 루프 안에서 동작)
+
+    요청 처리 중에는 큐에 넣기만 하고, 백그라운드 태스크가 batch_size 행 또는
+    flush_interval_ms 마다 한 번의 INSERT로 기록하며 ApiUsageHourly 집계를 함께 갱신한다.
+    큐가 가득 차면 버린다.
+    """
+
+    def __init__(self, max_queue=10000, batch_size=200, flush_interval_ms=500):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval_ms = flush_interval_ms
+        self.payload_policy = PayloadPolicy(
+            default=settings.API_LOG_DEFAULT_POLICY,
+            policies=parse_policies(settings.API_LOG_POLICIES)
+        )
+        self._queue = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def submit(self, request, key_id, request_data, response_data, status_code):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        request_data, response_data = self.payload_policy.apply(
+            request.url.path, status_code, request_data, response_data
+        )
+        row = dict.fromkeys(_COLUMNS)
+        row.update(
+            api_key_id=key_id,
+            endpoint=request.url.path,
+            method=request.method,
+            request_data=request_data,
+            response_data=response_data,
+            status_code=status_code,
+            ip_address=request.client.host if request.client else None,
+            user_agent=(request.headers.get('user-agent') or '')[:200],
+            timestamp=datetime.utcnow()
+        )
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def run(self):
+        """백그라운드 기록 태스크 (종료 시 취소되면 남은 로그를 기록하고 끝냄)"""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        interval = self.flush_interval_ms / 1000
+        batch = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                await self._write(batch)
+                batch = []
+        except asyncio.CancelledError:
+            # 모으던 중인 배치도 함께 기록
+            pending = batch
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            if pending:
+                await self._write(pending)
+            raise
+
+    async def _write(self, batch):
+        try:
+            async with database.transaction():
+                await database.execute_many(api_log_table.insert(), batch)
+                await database.execute_many(_usage_upsert(), ApiUsageHourly.aggregate(batch))
+            self.written += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"API log batch write failed ({len(batch)} rows): {str(e)}")
+
+    def stats(self):
+        return {
+            'queued': self._queue.qsize() if self._queue else 0,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed
+        }
+
+
+api_log_writer = AsyncApiLogWriter(
+    max_queue=settings.API_LOG_QUEUE_SIZE,
+    batch_size=settings.API_LOG_BATCH_SIZE,
+    flush_interval_ms=settings.API_LOG_FLUSH_MS
+)
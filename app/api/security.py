@@ -0,0 +1,143 @@
+from datetime import datetime
+import asyncio
+import logging
+import time
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from limits import parse_many
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+from sqlalchemy import or_, select
+
+# 'sqlite-ratelimit://' 저장소 등록
+import rate_limit_storage
+from app.database import database, metadata, settings
+
+logger = logging.getLogger(__name__)
+
+api_key_table = metadata.tables['api_key']
+
+
+class ApiError(Exception):
+    """{'error': message} JSON 응답으로 바뀌는 오류 (Flask 앱과 같은 형식)"""
+
+    def __init__(self, status_code, message, headers=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+        self.headers = headers
+
+
+class AsyncApiKeyStore:
+    """활성 API 키 캐시 + last_used_at 지연 기록 (Flask 앱의 ApiKeyCache와 같은 방식)"""
+
+    def __init__(self, refresh_interval=60, flush_interval=30):
+        self.refresh_interval = refresh_interval
+        self.flush_interval = flush_interval
+        self._keys = {}
+        self._quotas = {}
+        self._loaded_at = None
+        self._reloading = asyncio.Lock()
+        self._pending = {}
+
+    async def reload(self):
+        rows = await database.fetch_all(
+            select(api_key_table.c.key, api_key_table.c.id, api_key_table.c.rate_limit)
+            .where(api_key_table.c.is_active == True)
+        )
+        self._keys = {row['key']: row['id'] for row in rows}
+        self._quotas = {row['id']: row['rate_limit'] for row in rows if row['rate_limit']}
+        self._loaded_at = time.monotonic()
+
+    async def resolve(self, key):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_interval:
+            async with self._reloading:
+                if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_interval:
+                    await self.reload()
+        return self._keys.get(key)
+
+    def quota(self, key_id):
+        return self._quotas.get(key_id)
+
+    def touch(self, key_id):
+        self._pending[key_id] = datetime.utcnow()
+
+    async def flush(self):
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        # databases의 execute_many는 파라미터를 .values()로 넘기므로 WHERE 바인드가 필요한 UPDATE는 키별로 실행
+        try:
+            async with database.transaction():
+                for key_id, used_at in pending.items():
+                    await database.execute(api_key_table.update().where(
+                        api_key_table.c.id == key_id,
+                        or_(api_key_table.c.last_used_at.is_(None), api_key_table.c.last_used_at < used_at)
+                    ).values(last_used_at=used_at))
+        except Exception as e:
+            logger.error(f"API key last_used_at flush failed: {str(e)}")
+            for key_id, used_at in pending.items():
+                self._pending.setdefault(key_id, used_at)
+            return 0
+        return len(pending)
+
+    async def run_flusher(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+
+api_keys = AsyncApiKeyStore(
+    refresh_interval=settings.API_KEY_CACHE_REFRESH,
+    flush_interval=settings.API_KEY_FLUSH_INTERVAL
+)
+
+# Flask 앱과 같은 카운터 저장소 (같은 서버의 모든 워커/프로세스가 공유)
+# SQLite 파일 I/O를 하므로 이벤트 루프가 아닌 스레드 풀에서 호출한다
+rate_limiter = FixedWindowRateLimiter(storage_from_string(settings.RATELIMIT_STORAGE_URI))
+_parsed_limits = {}
+
+
+def _limits(value):
+    if value not in _parsed_limits:
+        _parsed_limits[value] = parse_many(value)
+    return _parsed_limits[value]
+
+
+def _hit(items, key, scope):
+    """한도 차감 - 초과한 한도 반환 (없으면 None)
+
+    카운터 키는 Flask-Limiter와 같은 LIMITER/api_key:<id>/<뷰 함수 이름>/... 형식이라
+    두 앱에서 같은 엔드포인트(verify_cid, login_by_phone)를 호출해도 한도를 함께 차감한다.
+    """
+    for item in items:
+        if not rate_limiter.hit(item, key, scope):
+            return item
+    return None
+
+
+async def require_api_key(request: Request):
+    """X-API-Key 확인 + 키별 호출 한도 적용 (FastAPI dependency) - ApiKey.id 반환"""
+    api_key = request.headers.get('X-API-Key')
+    if not api_key:
+        raise ApiError(401, 'API key is required.')
+
+    key_id = await api_keys.resolve(api_key)
+    if not key_id:
+        raise ApiError(401, 'Invalid API key.')
+
+    # 한도가 없는 키(rate_limit NULL, API_RATE_LIMIT_DEFAULT 비어 있음)는 Flask 앱과 같이 제한하지 않음
+    quota = api_keys.quota(key_id) or settings.API_RATE_LIMIT_DEFAULT
+    item = None
+    if quota:
+        item = await run_in_threadpool(_hit, _limits(quota), f'api_key:{key_id}', request.scope['route'].name)
+    if item is not None:
+        reset_at, _ = await run_in_threadpool(rate_limiter.get_window_stats, item, f'api_key:{key_id}',
+                                              request.scope['route'].name)
+        raise ApiError(429, f'Rate limit exceeded ({item}).',
+                       headers={'Retry-After': str(max(int(reset_at - time.time()), 1))})
+
+    api_keys.touch(key_id)
+    request.state.api_key_id = key_id
+    return key_id
@@ -0,0 +1,128 @@
+from datetime import datetime
+import json
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+
+from app.api.logger import api_log_writer
+from app.api.security import require_api_key
+from app.database import database, metadata
+from verify_cache import VerificationRecord
+
+router = APIRouter(prefix='/api/v1')
+
+cid_table = metadata.tables['cid']
+member_table = metadata.tables['member']
+
+
+async def read_json(request):
+    """요청 본문 (원문, JSON 객체) - JSON이 아니면 객체는 None"""
+    body = (await request.body()).decode('utf-8', 'replace')
+    try:
+        data = json.loads(body) if body else None
+    except ValueError:
+        data = None
+    return body, data if isinstance(data, dict) else None
+
+
+def respond(request, key_id, request_body, payload, status_code=200):
+    """JSON 응답 + ApiLog 기록 (Flask 앱의 require_api_key와 같은 로그 형식)"""
+    response = JSONResponse(payload, status_code=status_code)
+    api_log_writer.submit(request, key_id, request_body, response.body.decode('utf-8'), status_code)
+    return response
+
+
+@router.post('/login')
+async def login_by_phone(request: Request, key_id=Depends(require_api_key)):
+    body, data = await read_json(request)
+    if not data or 'phone' not in data:
+        return respond(request, key_id, body, {'error': 'Phone number is required.'}, 400)
+
+    member = await database.fetch_one(
+        select(member_table.c.id, member_table.c.name, member_table.c.phone, member_table.c.expiry_date)
+        .where(member_table.c.phone == data['phone'])
+        .limit(1)
+    )
+    if not member:
+        return respond(request, key_id, body, {
+            'success': False,
+            'error': 'Unregistered phone number.'
+        }, 401)
+
+    if member['expiry_date'] < datetime.now():
+        return respond(request, key_id, body, {
+            'success': False,
+            'error': 'Service period has expired.'
+        }, 401)
+
+    rows = await database.fetch_all(
+        select(cid_table.c.cid_value)
+        .where(cid_table.c.member_id == member['id'], cid_table.c.is_active == True)
+    )
+    active_cids = [row['cid_value'] for row in rows]
+
+    return respond(request, key_id, body, {
+        'success': True,
+        'member': {
+            'name': member['name'],
+            'phone': member['phone'],
+            'expiry_date': member['expiry_date'].strftime('%Y-%m-%d'),
+            'cids': active_cids,
+            'cid_count': len(active_cids)
+        }
+    })
+
+
+@router.post('/verify')
+async def verify_cid(request: Request, key_id=Depends(require_api_key)):
+    body, data = await read_json(request)
+    if not data or 'cid' not in data:
+        return respond(request, key_id, body, {'error': 'CID is required.'}, 400)
+
+    record = await lookup_verification(data['cid'])
+    return respond(request, key_id, body, verification_result(record))
+
+
+def verification_result(record):
+    """검증 정보 -> /api/v1/verify 응답 형식 (Flask 앱과 동일)"""
+    if not record:
+        return {
+            'valid': False,
+            'message': 'Unregistered CID.'
+        }
+
+    if not record.is_active:
+        return {
+            'valid': False,
+            'message': 'Deactivated CID.'
+        }
+
+    if record.expiry_date < datetime.now():
+        return {
+            'valid': False,
+            'message': 'Service period has expired.'
+        }
+
+    return {
+        'valid': True,
+        'message': 'Verified.',
+        'expiry_date': record.expiry_date.strftime('%Y-%m-%d'),
+        'member_name': record.name,
+        'member_phone': record.phone
+    }
+
+
+async def lookup_verification(cid_value):
+    """CID 검증 정보 조회 (CID-Member 조인 1회)
+
+    관리자 앱의 verify_cache.invalidate()는 이 프로세스에 닿지 않으므로 캐시하지 않는다
+    (비활성화/만료 변경이 바로 반영되어야 함).
+    """
+    row = await database.fetch_one(
+        select(cid_table.c.is_active, member_table.c.expiry_date, member_table.c.name, member_table.c.phone)
+        .select_from(cid_table.join(member_table, cid_table.c.member_id == member_table.c.id))
+        .where(cid_table.c.cid_value == cid_value)
+        .limit(1)
+    )
+    return VerificationRecord(row['is_active'], row['expiry_date'], row['name'], row['phone']) if row else None
@@ -1,25 +1,65 @@
-from sqlalchemy import create_engine, MetaData
-from databases import Database
 import os
+import sys
+
+from databases import Database
 from dotenv import load_dotenv
 
 # 환경변수 로드
 load_dotenv()
 
-# SQLite 데이터베이스 사용
-DATABASE_URL = "sqlite:///./quicker.db"
-database = Database(DATABASE_URL)
-metadata = MetaData()
+# Flask 관리자 앱(../models.py, ../config.py)과 같은 스키마/설정 사용
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from config import config
+from models import db
+
+settings = config[os.environ.get('FLASK_ENV', 'development')]
+metadata = db.metadata
+
+
+def async_database_url(uri):
+    """Flask-SQLAlchemy URI -> databases URI
+
+    Flask-SQLAlchemy는 상대 경로 SQLite 파일을 instance 폴더 기준으로 찾으므로 같은 파일을 가리키도록 맞춘다.
+    """
+    if uri.startswith('sqlite:///') and not uri.startswith('sqlite:////'):
+        path = uri[len('sqlite:///'):]
+        if path != ':memory:':
+            return 'sqlite:///' + os.path.join(ROOT_DIR, 'instance', path)
+    return uri
+
+
+def pool_options(uri):
+    """비동기 연결 풀 크기
+
+    PostgreSQL은 이 서비스 몫(API_DB_MAX_CONNECTIONS)을 uvicorn 워커 수(API_WORKERS)로 나눈다.
+    관리자 앱 몫(DB_MAX_CONNECTIONS)과 합쳐 DB의 연결 한도를 넘지 않게 정할 것.
+    """
+    engine_options = getattr(settings, 'SQLALCHEMY_ENGINE_OPTIONS', {})
+    if uri.startswith('postgresql'):
+        workers = max(int(os.environ.get('API_WORKERS', 2)), 1)
+        max_connections = int(os.environ.get('API_DB_MAX_CONNECTIONS', 4))
+        per_worker = max(max_connections // workers, 1)
+        return {
+            'min_size': 1,
+            'max_size': per_worker,
+            'command_timeout': int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 5000)) / 1000
+        }
+    if uri.startswith('sqlite'):
+        return {'timeout': engine_options.get('connect_args', {}).get('timeout', 5)}
+    return {}
+
+
+DATABASE_URL = async_database_url(settings.SQLALCHEMY_DATABASE_URI)
+database = Database(DATABASE_URL, **pool_options(DATABASE_URL))
 
-# 데이터베이스 엔진 생성
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False}  # SQLite를 위한 설정
-)
 
 # 데이터베이스 연결/종료 이벤트
 async def connect_db():
     await database.connect()
 
+
 async def disconnect_db():
-    await database.disconnect()
\ No newline at end of file
+    await database.disconnect()
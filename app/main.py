@@ -1,16 +1,51 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from starlette.middleware.sessions import SessionMiddleware
+import asyncio
 import os
 from dotenv import load_dotenv
 
+from app.database import connect_db, disconnect_db
+from app.api.logger import api_log_writer
+from app.api.security import ApiError, api_keys
+from app.api import verify
+
 # 환경변수 로드
 load_dotenv()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app):
+    await connect_db()
+    background_tasks = [
+        asyncio.create_task(api_log_writer.run()),
+        asyncio.create_task(api_keys.run_flusher())
+    ]
+    try:
+        yield
+    finally:
+        # 남은 ApiLog / last_used_at 기록 후 연결 종료
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+        await api_keys.flush()
+        await disconnect_db()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# 외부 클라이언트용 API (/api/v1/verify, /api/v1/login) - Flask 관리자 앱과 같은 DB/스키마 사용
+app.include_router(verify.router)
+
+
+@app.exception_handler(ApiError)
+async def api_error_handler(request: Request, exc: ApiError):
+    return JSONResponse({'error': exc.message}, status_code=exc.status_code, headers=exc.headers)
 
 # 정적 파일과 템플릿 설정
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -0,0 +1,200 @@
+from datetime import datetime
+import hashlib
+import json
+import logging
+import os
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+
+class BackupStore:
+    """청크 단위 내용 주소 백업 저장소
+
+    스냅샷을 청크로 나눠 SHA-256 이름으로 압축 저장하고, 스냅샷마다 청크 목록(manifest)을 남긴다.
+    이전 스냅샷과 같은 청크는 다시 쓰지 않으므로 자주 백업해도 디스크 사용량은 변경분만큼 늘어난다.
+    SQLite는 페이지가 제자리에서 바뀌므로 청크 크기를 페이지 크기의 배수로 두면 변경되지 않은 구간이 그대로 재사용된다.
+    논리 덤프(JSON Lines)는 행이 추가/삭제되면 뒤쪽 바이트가 모두 밀리므로 고정 크기 대신 줄 내용으로 경계를 정한다
+    (line_chunks=True) - 바뀐 행이 있는 청크만 새로 기록된다. 덤프는 압축하지 않은 채로 넣어야 한다.
+
+    root/
+      chunks/ab/abcdef....z   압축된 청크
+      manifests/<name>.json   스냅샷별 청크 목록
+    """
+
+    # 줄 단위 경계: 줄 CRC의 하위 비트가 모두 0이면 그 줄 뒤에서 자름 (평균 1024줄마다)
+    LINE_BOUNDARY_MASK = 1023
+    # 테이블 헤더 줄({"table": ...})은 항상 새 청크의 시작
+    TABLE_HEADER = b'{"table": '
+
+    def __init__(self, root, chunk_size=256 * 1024, compress_level=6, gc_grace=3600):
+        self.root = root
+        self.chunk_size = chunk_size
+        self.compress_level = compress_level
+        self.gc_grace = gc_grace  # 진행 중인 저장과 겹치지 않도록 최근 청크는 정리하지 않음
+        self.chunk_dir = os.path.join(root, 'chunks')
+        self.manifest_dir = os.path.join(root, 'manifests')
+        os.makedirs(self.chunk_dir, exist_ok=True)
+        os.makedirs(self.manifest_dir, exist_ok=True)
+
+    def _chunk_path(self, digest):
+        return os.path.join(self.chunk_dir, digest[:2], digest + '.z')
+
+    def _manifest_path(self, name):
+        return os.path.join(self.manifest_dir, os.path.basename(name) + '.json')
+
+    def exists(self, name):
+        return os.path.exists(self._manifest_path(name))
+
+    def _fixed_chunks(self, f):
+        return iter(lambda: f.read(self.chunk_size), b'')
+
+    def _line_chunks(self, f):
+        """줄 내용으로 정한 경계의 청크 (최대 chunk_size * 4)
+
+        경계가 앞쪽 내용과 무관하게 정해지므로 행 하나가 바뀌어도 그 행이 속한 청크만 달라진다.
+        """
+        buffer = []
+        size = 0
+        max_size = self.chunk_size * 4
+        for line in f:
+            if line.startswith(self.TABLE_HEADER) and buffer:
+                yield b''.join(buffer)
+                buffer, size = [], 0
+            buffer.append(line)
+            size += len(line)
+            if zlib.crc32(line) & self.LINE_BOUNDARY_MASK == 0 or size >= max_size:
+                yield b''.join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield b''.join(buffer)
+
+    def put(self, source_path, name, line_chunks=False):
+        """파일을 스냅샷 name으로 저장 - {'size', 'checksum', 'chunks', 'new_chunks', 'stored_size'}
+
+        line_chunks: 텍스트 줄 단위 내용 기반 경계 사용 (논리 덤프), 아니면 chunk_size 고정 경계 (SQLite)
+        """
+        chunks = []
+        new_chunks = 0
+        stored_size = 0
+        size = 0
+        checksum = hashlib.sha256()
+
+        with open(source_path, 'rb') as f:
+            for data in (self._line_chunks(f) if line_chunks else self._fixed_chunks(f)):
+                size += len(data)
+                checksum.update(data)
+                digest = hashlib.sha256(data).hexdigest()
+                chunks.append(digest)
+
+                path = self._chunk_path(digest)
+                if os.path.exists(path):
+                    os.utime(path)  # 정리 대상에서 제외
+                    continue
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                compressed = zlib.compress(data, self.compress_level)
+                tmp_path = f'{path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'wb') as out:
+                    out.write(compressed)
+                os.replace(tmp_path, path)
+                new_chunks += 1
+                stored_size += len(compressed)
+
+        manifest = {
+            'name': name,
+            'created_at': datetime.utcnow().isoformat(),
+            'size': size,
+            'checksum': checksum.hexdigest(),
+            'chunk_size': self.chunk_size,
+            'chunking': 'lines' if line_chunks else 'fixed',
+            'chunks': chunks
+        }
+        # 청크를 모두 쓴 뒤 manifest 기록
+        manifest_path = self._manifest_path(name)
+        with open(manifest_path + '.tmp', 'w') as out:
+            json.dump(manifest, out)
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+        return {
+            'size': size,
+            'checksum': manifest['checksum'],
+            'chunks': len(chunks),
+            'new_chunks': new_chunks,
+            'stored_size': stored_size
+        }
+
+    def manifest(self, name):
+        with open(self._manifest_path(name)) as f:
+            return json.load(f)
+
+    def manifests(self):
+        """저장된 모든 스냅샷의 manifest (청크 목록 포함)"""
+        for filename in sorted(os.listdir(self.manifest_dir)):
+            if filename.endswith('.json'):
+                with open(os.path.join(self.manifest_dir, filename)) as f:
+                    yield json.load(f)
+
+    def restore(self, name, dest_path):
+        """manifest의 청크를 이어 붙여 dest_path에 복원 (체크섬 확인 후 rename)"""
+        manifest = self.manifest(name)
+        checksum = hashlib.sha256()
+        tmp_path = dest_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as out:
+                for digest in manifest['chunks']:
+                    with open(self._chunk_path(digest), 'rb') as f:
+                        data = zlib.decompress(f.read())
+                    if hashlib.sha256(data).hexdigest() != digest:
+                        raise ValueError(f'백업 청크가 손상되었습니다: {digest}')
+                    checksum.update(data)
+                    out.write(data)
+            if checksum.hexdigest() != manifest['checksum']:
+                raise ValueError('백업 체크섬이 일치하지 않습니다.')
+            os.replace(tmp_path, dest_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return dest_path
+
+    def delete(self, name):
+        path = self._manifest_path(name)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def gc(self):
+        """어떤 manifest도 참조하지 않는 청크 삭제 - (삭제한 청크 수, 확보한 bytes)"""
+        referenced = set()
+        for filename in os.listdir(self.manifest_dir):
+            if filename.endswith('.json'):
+                with open(os.path.join(self.manifest_dir, filename)) as f:
+                    referenced.update(json.load(f)['chunks'])
+
+        removed = 0
+        freed = 0
+        cutoff = time.time() - self.gc_grace
+        for prefix in os.listdir(self.chunk_dir):
+            prefix_dir = os.path.join(self.chunk_dir, prefix)
+            for filename in os.listdir(prefix_dir):
+                path = os.path.join(prefix_dir, filename)
+                if filename[:-2] in referenced or os.path.getmtime(path) > cutoff:
+                    continue
+                freed += os.path.getsize(path)
+                os.remove(path)
+                removed += 1
+        return removed, freed
+
+    def stats(self):
+        chunk_count = 0
+        stored_size = 0
+        for prefix in os.listdir(self.chunk_dir):
+            prefix_dir = os.path.join(self.chunk_dir, prefix)
+            for filename in os.listdir(prefix_dir):
+                chunk_count += 1
+                stored_size += os.path.getsize(os.path.join(prefix_dir, filename))
+        return {
+            'snapshots': len([f for f in os.listdir(self.manifest_dir) if f.endswith('.json')]),
+            'chunks': chunk_count,
+            'stored_size': stored_size
+        }
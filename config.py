@@ -3,11 +3,162 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# 백엔드별 엔진 설정
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',  # 읽기와 쓰기가 서로 막지 않음
+    'synchronous': 'NORMAL',  # WAL에서는 체크포인트 때만 fsync
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'cache_size': -int(os.environ.get('SQLITE_CACHE_SIZE_KB', 64 * 1024)),  # 음수는 KiB 단위
+}
+
+def engine_options(database_uri):
+    """DB URI에 맞는 SQLALCHEMY_ENGINE_OPTIONS
+
+    PostgreSQL 풀 크기는 DB_MAX_CONNECTIONS를 gunicorn 워커 수(WEB_CONCURRENCY)로 나눠 정한다.
+    (SQLite PRAGMA는 연결 시 main.py에서 SQLITE_PRAGMAS로 적용)
+    """
+    if database_uri.startswith('sqlite'):
+        return {
+            'connect_args': {
+                'timeout': SQLITE_PRAGMAS['busy_timeout'] / 1000,
+                'check_same_thread': False
+            }
+        }
+    
+    if database_uri.startswith('postgresql'):
+        workers = max(int(os.environ.get('WEB_CONCURRENCY', 1)), 1)
+        max_connections = int(os.environ.get('DB_MAX_CONNECTIONS', 20))
+        # 워커 몫(pool_size + max_overflow)이 DB_MAX_CONNECTIONS / 워커 수를 넘지 않도록 2:1로 나눔
+        per_worker = max(max_connections // workers, 2)
+        pool_size = max(per_worker * 2 // 3, 1)
+        # 요청용 한도 - 마이그레이션/백업/정리/재계산은 models.lift_statement_timeout으로 해제
+        statement_timeout = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 5000))
+        return {
+            'pool_size': pool_size,
+            'max_overflow': per_worker - pool_size,
+            'pool_pre_ping': True,
+            'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+            'pool_timeout': 10,
+            'connect_args': {'options': f'-c statement_timeout={statement_timeout}'}
+        }
+    
+    return {}
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key-change-in-production'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JSON_AS_ASCII = False
 
+    # Rate limit 카운터 저장소 (워커 간 공유, 'memory://'는 워커별) / API 키별 기본 한도 (ApiKey.rate_limit이 없을 때)
+    # 키 한도는 그 키를 쓰는 모든 클라이언트/워커의 합계이므로 비워 두면(기본) rate_limit이 없는 키는 무제한
+    RATELIMIT_STORAGE_URI = os.environ.get('RATELIMIT_STORAGE_URI', 'sqlite-ratelimit:///ratelimit.db')
+    API_RATE_LIMIT_DEFAULT = os.environ.get('API_RATE_LIMIT_DEFAULT', '')
+
+    # 시작 시 미적용 스키마 마이그레이션 자동 적용
+    AUTO_MIGRATE = os.environ.get('AUTO_MIGRATE', 'true').lower() == 'true'
+
+    # 회원 목록 페이지 크기 (기본/최대)
+    MEMBERS_PAGE_SIZE = int(os.environ.get('MEMBERS_PAGE_SIZE', 100))
+    MEMBERS_PAGE_MAX = int(os.environ.get('MEMBERS_PAGE_MAX', 500))
+
+    # 알림 목록 페이지 크기 (기본/최대)
+    NOTIFICATIONS_PAGE_SIZE = int(os.environ.get('NOTIFICATIONS_PAGE_SIZE', 20))
+    NOTIFICATIONS_PAGE_MAX = int(os.environ.get('NOTIFICATIONS_PAGE_MAX', 100))
+
+    # 내보내기 시 한 번에 읽을 회원 수
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 500))
+
+    # SQLite 온라인 백업 단계당 복사 페이지 수 / 단계마다 쉬는 시간 ms (쓰기 요청이 끼어들 틈, 잠금 충돌 시 재시도 간격도 동일)
+    BACKUP_PAGES_PER_STEP = int(os.environ.get('BACKUP_PAGES_PER_STEP', 256))
+    BACKUP_STEP_SLEEP_MS = int(os.environ.get('BACKUP_STEP_SLEEP_MS', 5))
+
+    # 백업 저장소 청크 크기 (SQLite 페이지 크기의 배수) / zlib 압축 레벨
+    BACKUP_CHUNK_SIZE = int(os.environ.get('BACKUP_CHUNK_SIZE', 256 * 1024))
+    BACKUP_COMPRESS_LEVEL = int(os.environ.get('BACKUP_COMPRESS_LEVEL', 6))
+
+    # 복원 중 쓰기 요청을 잡아 둘 최대 시간 (초, 넘으면 503)
+    RESTORE_HOLD_TIMEOUT = int(os.environ.get('RESTORE_HOLD_TIMEOUT', 30))
+
+    # 통계 개요 스냅샷 유지 시간 (초, 지나면 백그라운드에서 갱신)
+    STATS_CACHE_TTL = int(os.environ.get('STATS_CACHE_TTL', 60))
+
+    # CID 검증 캐시 (워커별)
+    VERIFY_CACHE_SIZE = int(os.environ.get('VERIFY_CACHE_SIZE', 10000))
+    VERIFY_CACHE_TTL = int(os.environ.get('VERIFY_CACHE_TTL', 60))  # 초
+
+    # /api/v1/verify/batch 요청당 최대 CID 수
+    VERIFY_BATCH_MAX = int(os.environ.get('VERIFY_BATCH_MAX', 500))
+
+    # /api/login 세션 토큰: 서명 키 'kid:secret' 목록 (첫 키로 서명, 나머지는 교체 기간 동안 검증만 - 없으면 SECRET_KEY에서 파생)
+    # 유효 기간 (초, 구독 만료가 더 빠르면 그 시각까지) / 다른 워커의 폐기 반영 주기 (초)
+    SESSION_TOKEN_KEYS = os.environ.get('SESSION_TOKEN_KEYS', '')
+    SESSION_TOKEN_TTL = int(os.environ.get('SESSION_TOKEN_TTL', 900))
+    SESSION_TOKEN_DENY_REFRESH = int(os.environ.get('SESSION_TOKEN_DENY_REFRESH', 10))
+    # /api/login에서 비밀번호를 설정하지 않은 회원도 거부 (기존 회원에게 비밀번호를 모두 설정한 뒤 켤 것)
+    MEMBER_PASSWORD_REQUIRED = os.environ.get('MEMBER_PASSWORD_REQUIRED', 'false').lower() == 'true'
+
+    # API 키 캐시 갱신 주기 / last_used_at 일괄 반영 주기 (초)
+    API_KEY_CACHE_REFRESH = int(os.environ.get('API_KEY_CACHE_REFRESH', 60))
+    API_KEY_FLUSH_INTERVAL = int(os.environ.get('API_KEY_FLUSH_INTERVAL', 30))
+
+    # ApiLog 비동기 일괄 기록 (큐 크기, 배치 크기, 기록 주기 ms, 큐 초과 시 drop/block)
+    API_LOG_QUEUE_SIZE = int(os.environ.get('API_LOG_QUEUE_SIZE', 10000))
+    API_LOG_BATCH_SIZE = int(os.environ.get('API_LOG_BATCH_SIZE', 200))
+    API_LOG_FLUSH_MS = int(os.environ.get('API_LOG_FLUSH_MS', 500))
+    API_LOG_FULL_POLICY = os.environ.get('API_LOG_FULL_POLICY', 'drop')
+    API_LOG_BLOCK_TIMEOUT = float(os.environ.get('API_LOG_BLOCK_TIMEOUT', 1.0))
+
+    # ApiLog 요청/응답 본문 기록 방식: full / truncate:N / hash / sample:R / none (오류 응답은 항상 full)
+    # 엔드포인트별: '/api/v1/verify=sample:0.1,/api/v1/verify/batch=hash'
+    API_LOG_DEFAULT_POLICY = os.environ.get('API_LOG_DEFAULT_POLICY', 'truncate:2048')
+    API_LOG_POLICIES = os.environ.get('API_LOG_POLICIES', '')
+
+    # API 사용량 알림 (시간당 호출 임계값, 오류율 임계값/최소 호출 수, 같은 알림 재발송 간격 초)
+    API_USAGE_ALERT_THRESHOLD = int(os.environ.get('API_USAGE_ALERT_THRESHOLD', 1000))
+    API_ERROR_RATE_THRESHOLD = float(os.environ.get('API_ERROR_RATE_THRESHOLD', 0.2))
+    API_ERROR_MIN_CALLS = int(os.environ.get('API_ERROR_MIN_CALLS', 20))
+    API_ALERT_COOLDOWN = int(os.environ.get('API_ALERT_COOLDOWN', 3600))
+
+    # 알림 SSE 스트림: 워커 간 변경 표시 파일 위치, 변경 확인 주기 (초), keepalive 주기 (초), 연결 최대 유지 시간 (초)
+    NOTIFICATION_STATE_DIR = os.environ.get('NOTIFICATION_STATE_DIR', 'notification_state')
+    NOTIFICATION_POLL_INTERVAL = float(os.environ.get('NOTIFICATION_POLL_INTERVAL', 1.0))
+    NOTIFICATION_KEEPALIVE = int(os.environ.get('NOTIFICATION_KEEPALIVE', 20))
+    NOTIFICATION_STREAM_MAX = int(os.environ.get('NOTIFICATION_STREAM_MAX', 300))
+    # 워커당 동시 알림 스트림 수 - 스트림마다 gthread 스레드 하나를 차지하므로 --threads(16)의 절반까지
+    NOTIFICATION_MAX_STREAMS = int(os.environ.get('NOTIFICATION_MAX_STREAMS', 8))
+    NOTIFICATION_STREAM_RETRY = int(os.environ.get('NOTIFICATION_STREAM_RETRY', 30))  # 한도 초과 시 재연결 대기(초)
+
+    # 만료 예정/API 사용량 알림을 받을 관리자 id ('1,3', 비우면 모든 관리자)
+    NOTIFICATION_ADMIN_IDS = os.environ.get('NOTIFICATION_ADMIN_IDS', '')
+
+    # 관리자별 읽지 않은 알림 카운터를 실제 개수로 맞추는 주기 (초)
+    NOTIFICATION_RECONCILE_INTERVAL = int(os.environ.get('NOTIFICATION_RECONCILE_INTERVAL', 3600))
+
+    # 만료 예정 회원 알림 주기 (초)
+    EXPIRY_SWEEP_INTERVAL = int(os.environ.get('EXPIRY_SWEEP_INTERVAL', 3600))
+
+    # 주기 작업 스케줄러 (워커 중 리더 하나만 실행)
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'true').lower() == 'true'
+    SCHEDULER_TICK = int(os.environ.get('SCHEDULER_TICK', 30))
+    SCHEDULER_LOCK_PATH = os.environ.get('SCHEDULER_LOCK_PATH', 'scheduler.lock')  # SQLite 사용 시 리더 잠금 파일
+
+    # 일일 통계 갱신 주기 (초) / 확정되지 않은 날짜를 찾을 기간 (일)
+    DAILY_STATS_REFRESH = int(os.environ.get('DAILY_STATS_REFRESH', 900))
+    DAILY_STATS_BACKFILL_DAYS = int(os.environ.get('DAILY_STATS_BACKFILL_DAYS', 90))
+
+    # 테이블별 보관 기간 (일, 0이면 무기한) - 지난 행은 ARCHIVE_DIR의 날짜별 압축 파일로 이동
+    ARCHIVE_DIR = os.environ.get('ARCHIVE_DIR', 'archive')
+    RETENTION_API_LOG_DAYS = int(os.environ.get('RETENTION_API_LOG_DAYS', 30))
+    RETENTION_LOGIN_LOG_DAYS = int(os.environ.get('RETENTION_LOGIN_LOG_DAYS', 90))
+    RETENTION_MEMBER_ACTIVITY_DAYS = int(os.environ.get('RETENTION_MEMBER_ACTIVITY_DAYS', 365))
+    RETENTION_NOTIFICATION_DAYS = int(os.environ.get('RETENTION_NOTIFICATION_DAYS', 90))  # 읽은 알림만
+    RETENTION_BATCH_SIZE = int(os.environ.get('RETENTION_BATCH_SIZE', 1000))
+    RETENTION_BATCH_PAUSE_MS = int(os.environ.get('RETENTION_BATCH_PAUSE_MS', 50))
+
+    # gunicorn 워커 수 (gunicorn도 같은 환경 변수를 기본값으로 사용)
+    WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 1))
+
 class ProductionConfig(Config):
     DEBUG = False
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'quicker-cid-server-secret-key-production-2024'
@@ -21,10 +172,12 @@ class ProductionConfig(Config):
         SQLALCHEMY_DATABASE_URI = database_url
     else:
         raise ValueError("DATABASE_URL environment variable is not set")
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
     
 class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///quicker.db'
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
 
 config = {
     'development': DevelopmentConfig,
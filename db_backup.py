@@ -0,0 +1,147 @@
+from datetime import datetime, date, time as dt_time
+from decimal import Decimal
+import hashlib
+import json
+import logging
+import os
+import time
+
+from sqlalchemy import select
+
+from models import db, lift_statement_timeout
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_checksum(path):
+    """파일 SHA-256 (청크 단위로 읽음)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def backup_extension(engine):
+    return '.db' if engine.dialect.name == 'sqlite' else '.jsonl'
+
+
+def backup_database(engine, dest_path, pages_per_step=256, step_sleep=0.005, batch_size=1000):
+    """실행 중인 DB를 dest_path에 일관된 상태로 백업
+
+    SQLite는 온라인 백업 API로 pages_per_step 페이지씩 복사하고 단계 사이에 잠금을 풀어
+    쓰기 요청이 전체 복사 동안 막히지 않게 한다. 그 외 DB는 테이블별 논리 덤프(JSON Lines)를
+    스트리밍으로 기록한다 (압축은 백업 저장소가 청크별로 하므로 여기서는 하지 않음 - 변경되지 않은 행의 청크 재사용). 임시 파일에 쓴 뒤 rename하므로 실패해도 반쪽 파일이 남지 않는다.
+
+    반환: {'size', 'page_count', 'checksum', 'duration_ms'}
+    """
+    started = time.monotonic()
+    tmp_path = dest_path + '.tmp'
+    try:
+        if engine.dialect.name == 'sqlite':
+            page_count = _sqlite_backup(engine, tmp_path, pages_per_step, step_sleep)
+        else:
+            page_count = None
+            _logical_dump(engine, tmp_path, batch_size)
+        os.replace(tmp_path, dest_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return {
+        'size': os.path.getsize(dest_path),
+        'page_count': page_count,
+        'checksum': file_checksum(dest_path),
+        'duration_ms': int((time.monotonic() - started) * 1000)
+    }
+
+
+def _sqlite_backup(engine, dest_path, pages_per_step, step_sleep):
+    import sqlite3
+
+    progress = {'total': 0}
+
+    def on_progress(status, remaining, total):
+        progress['total'] = total
+        # sleep 인자는 BUSY/LOCKED일 때만 쓰이므로, 단계 사이 쓰기 요청이 끼어들 틈은 여기서 만든다
+        # (단계가 끝나면 원본 잠금이 풀린 상태)
+        if remaining and step_sleep:
+            time.sleep(step_sleep)
+
+    source = engine.raw_connection()
+    target = sqlite3.connect(dest_path)
+    try:
+        source.driver_connection.backup(target, pages=pages_per_step, progress=on_progress, sleep=step_sleep)
+    finally:
+        target.close()
+        source.close()
+    return progress['total']
+
+
+def verify_sqlite_snapshot(path, required_tables=()):
+    """복원 전 스냅샷 검사 - 무결성 검사 실패나 필수 테이블 누락 시 ValueError"""
+    import sqlite3
+
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        result = conn.execute('PRAGMA integrity_check').fetchone()[0]
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    except sqlite3.DatabaseError as e:
+        raise ValueError(f'백업 파일이 올바른 SQLite 데이터베이스가 아닙니다: {e}')
+    finally:
+        conn.close()
+    if result != 'ok':
+        raise ValueError(f'백업 무결성 검사 실패: {result}')
+    missing = [table for table in required_tables if table not in tables]
+    if missing:
+        raise ValueError(f'백업에 필요한 테이블이 없습니다: {", ".join(missing)}')
+
+
+def restore_sqlite_database(engine, source_path, pages_per_step=-1):
+    """SQLite 스냅샷 파일 내용을 실행 중인 DB에 복사 (온라인 백업 API 역방향)
+
+    파일을 덮어쓰지 않고 DB 연결을 통해 한 번에 기록하므로 WAL과 다른 연결의 잠금이 지켜지고,
+    다른 연결에서는 복원 전/후 상태만 보인다.
+    """
+    import sqlite3
+
+    source = sqlite3.connect(source_path)
+    target = engine.raw_connection()
+    try:
+        source.backup(target.driver_connection, pages=pages_per_step)
+    finally:
+        target.close()
+        source.close()
+    engine.dispose()
+
+
+def json_default(value):
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.hex()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def _logical_dump(engine, dest_path, batch_size):
+    # 테이블마다 헤더 줄({"table", "columns"}) 다음에 행을 한 줄씩 기록 (외래키 순서)
+    with engine.connect() as conn, open(dest_path, 'w', encoding='utf-8', newline='\n') as out:
+        with conn.begin():
+            if conn.dialect.name == 'postgresql':
+                # 모든 테이블을 같은 스냅샷에서 읽음
+                conn.exec_driver_sql('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+                lift_statement_timeout(conn)
+            for table in db.metadata.sorted_tables:
+                columns = [column.name for column in table.columns]
+                out.write(json.dumps({'table': table.name, 'columns': columns}) + '\n')
+                order_by = list(table.primary_key.columns) or list(table.columns)
+                result = conn.execution_options(yield_per=batch_size).execute(
+                    select(table).order_by(*order_by)
+                )
+                for row in result:
+                    out.write(json.dumps(list(row), default=json_default, ensure_ascii=False) + '\n')
@@ -30,7 +30,7 @@ python3 -c "from main import app, db; app.app_context().push(); db.create_all()"
 
 # Gunicorn 설치 및 실행 테스트
 pip install gunicorn
-gunicorn --bind 0.0.0.0:5000 main:app --daemon
+gunicorn --bind 0.0.0.0:5000 --worker-class gthread --threads 16 main:app --daemon
 
 # systemd 서비스 등록
 sudo tee /etc/systemd/system/quicker.service > /dev/null <<EOF
@@ -44,7 +44,7 @@ WorkingDirectory=/home/ubuntu/quicker-cid-server
 Environment=PATH=/home/ubuntu/quicker-cid-server/venv/bin
 Environment=FLASK_ENV=production
 Environment=SECRET_KEY=$SECRET_KEY
-ExecStart=/home/ubuntu/quicker-cid-server/venv/bin/gunicorn --bind 0.0.0.0:5000 main:app
+ExecStart=/home/ubuntu/quicker-cid-server/venv/bin/gunicorn --bind 0.0.0.0:5000 --worker-class gthread --threads 16 main:app
 Restart=always
 
 [Install]
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+import logging
+
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Member, Notification, ExpiryNotice, notification_recipients
+
+logger = logging.getLogger(__name__)
+
+# 만료 예정 알림 구간 (일) - 좁은 구간부터
+EXPIRY_WINDOWS = (3, 7)
+
+
+def sweep_expiring_members(now=None, admin_ids=None):
+    """만료 예정 구간(7일/3일)에 들어온 회원 알림 일괄 생성 (기본 수신자: notification_recipients())
+
+    회원/만료일/구간마다 한 번만 알림을 만든다. ExpiryNotice의 유니크 제약으로
+    여러 워커가 동시에 실행해도 중복되지 않는다. 생성한 알림 수를 반환.
+    """
+    now = now or datetime.now()
+    horizon = now + timedelta(days=max(EXPIRY_WINDOWS))
+
+    # expiry_date 인덱스 범위 조회
+    members = db.session.query(
+        Member.id,
+        Member.name,
+        Member.expiry_date
+    ).filter(
+        Member.expiry_date > now,
+        Member.expiry_date <= horizon
+    ).all()
+    if not members:
+        return 0
+
+    sent = {
+        (notice.member_id, notice.window_days, notice.expiry_date)
+        for notice in ExpiryNotice.query.filter(
+            ExpiryNotice.member_id.in_([member.id for member in members]),
+            ExpiryNotice.expiry_date > now
+        )
+    }
+
+    items = []
+    for member_id, name, expiry_date in members:
+        days_until_expiry = (expiry_date - now).days
+        window = next(days for days in EXPIRY_WINDOWS if days_until_expiry <= days)
+        if (member_id, window, expiry_date) in sent:
+            continue
+
+        try:
+            with db.session.begin_nested():
+                db.session.add(ExpiryNotice(member_id=member_id, window_days=window, expiry_date=expiry_date))
+        except IntegrityError:
+            # 다른 워커가 먼저 기록함
+            continue
+
+        items.append({
+            'title': '회원 만료 예정',
+            'message': f'회원 {name}의 이용 기간이 {days_until_expiry}일 후 만료됩니다.',
+            'priority': 'high' if days_until_expiry <= 3 else 'normal',
+            'data': {'member_id': member_id}
+        })
+
+    if not items:
+        db.session.commit()
+        return 0
+
+    for admin_id in (admin_ids if admin_ids is not None else notification_recipients()):
+        Notification.create_many(admin_id=admin_id, type='expiry', items=items)
+    db.session.commit()  # 수신자가 없어도 ExpiryNotice는 기록
+    return len(items)
+
@@ -0,0 +1,90 @@
+import hashlib
+import random
+
+MODES = ('full', 'truncate', 'hash', 'sample', 'none')
+
+
+def parse_policy(spec):
+    """'truncate:512' -> ('truncate', 512), 'sample:0.1' -> ('sample', 0.1), 'hash' -> ('hash', None)"""
+    mode, _, arg = spec.strip().partition(':')
+    mode = mode.strip().lower()
+    if mode not in MODES:
+        raise ValueError(f'Unknown API log policy: {spec}')
+    if mode == 'truncate':
+        return mode, int(arg or 1024)
+    if mode == 'sample':
+        rate = float(arg or 0.1)
+        if not 0 <= rate <= 1:
+            raise ValueError(f'Sample rate must be between 0 and 1: {spec}')
+        return mode, rate
+    return mode, None
+
+
+def parse_policies(spec):
+    """'/api/v1/verify=truncate:512,/api/v1/login=sample:0.1' -> {endpoint: (mode, arg)}"""
+    policies = {}
+    for item in (spec or '').split(','):
+        if not item.strip():
+            continue
+        endpoint, _, policy = item.partition('=')
+        policies[endpoint.strip()] = parse_policy(policy)
+    return policies
+
+
+class PayloadPolicy:
+    """엔드포인트별 ApiLog 요청/응답 본문 기록 방식
+
+    - full: 그대로
+    - truncate:N: 앞 N바이트만 (잘린 경우 원래 크기 표시)
+    - hash: SHA-256과 크기만
+    - sample:R: R 비율의 요청만 그대로, 나머지는 본문 생략
+    - none: 본문 생략
+    오류 응답(status >= 400)은 정책과 관계없이 그대로 기록한다.
+    """
+
+    def __init__(self, app=None, default='truncate:2048', policies=None):
+        self.default = parse_policy(default)
+        self.policies = policies or {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.default = parse_policy(app.config.get('API_LOG_DEFAULT_POLICY', 'truncate:2048'))
+        self.policies = parse_policies(app.config.get('API_LOG_POLICIES', ''))
+
+    def for_endpoint(self, endpoint):
+        return self.policies.get(endpoint, self.default)
+
+    def apply(self, endpoint, status_code, request_data, response_data):
+        """정책을 적용한 (request_data, response_data)"""
+        if status_code is not None and status_code >= 400:
+            return request_data, response_data
+
+        mode, arg = self.for_endpoint(endpoint)
+        if mode == 'full':
+            return request_data, response_data
+        if mode == 'sample':
+            if random.random() < arg:
+                return request_data, response_data
+            return None, None
+        if mode == 'none':
+            return None, None
+        if mode == 'hash':
+            return _hash(request_data), _hash(response_data)
+        return _truncate(request_data, arg), _truncate(response_data, arg)
+
+
+def _hash(data):
+    if not data:
+        return data
+    encoded = data.encode('utf-8')
+    return f'sha256:{hashlib.sha256(encoded).hexdigest()} ({len(encoded)} bytes)'
+
+
+def _truncate(data, limit):
+    if not data:
+        return data
+    encoded = data.encode('utf-8')
+    if len(encoded) <= limit:
+        return data
+    return encoded[:limit].decode('utf-8', 'ignore') + f'... [truncated, {len(encoded)} bytes]'
@@ -1,21 +1,45 @@
-﻿from flask import Flask, render_template, request, redirect, url_for, jsonify, send_file, flash
+﻿from flask import Flask, render_template, request, redirect, url_for, jsonify, send_file, flash, g, Response, stream_with_context
 from datetime import datetime, timedelta, time, date
-from models import db, Member, CID, Admin, LoginLog, ApiKey, ApiLog, Backup, BackupSchedule, DailyStats, MemberActivity
+from models import db, Member, CID, Admin, LoginLog, ApiKey, ApiLog, ApiUsageHourly, Backup, BackupSchedule, DailyStats, MemberActivity, reconcile_unread_notifications
 import os
 import logging
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
 from dateutil.parser import parse
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from functools import wraps
+from werkzeug.exceptions import HTTPException
 from openpyxl.styles import Alignment, Font
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-import json
+from limits import parse_many
+import rate_limit_storage  # 'sqlite-ratelimit://' 저장소 등록
+import csv
+import io
+import tempfile
 import sqlite3
 import shutil
-# from apscheduler.schedulers.background import BackgroundScheduler
-# from apscheduler.triggers.cron import CronTrigger
 from sqlalchemy.sql import func
+from sqlalchemy import and_, or_, event
+from sqlalchemy.orm import selectinload, joinedload, defer
+from verify_cache import VerificationCache, VerificationRecord, MISS
+from api_keys import ApiKeyCache
+from api_log_writer import ApiLogWriter
+from log_policy import PayloadPolicy
+from stats_cache import SnapshotCache
+from usage_monitor import UsageMonitor
+from expiry_sweeper import sweep_expiring_members
+from migrations import run_migrations
+from db_backup import backup_database, backup_extension, restore_sqlite_database, verify_sqlite_snapshot
+from backup_store import BackupStore
+from scheduler import Scheduler, latest_slot
+from restore_gate import RestoreGate
+from retention import apply_retention, archive_stats, retention_horizon
+from session_tokens import SessionTokens, InvalidToken
+from notification_events import NotificationBroker
+from pagination import encode_cursor, decode_cursor
+from routes.notifications import bp as notifications_bp
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -24,7 +48,7 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 
 # 환경별 설정 로드
-from config import config
+from config import config, SQLITE_PRAGMAS
 import os
 config_name = os.environ.get('FLASK_ENV', 'development')
 logger.info(f"Loading configuration for environment: {config_name}")
@@ -39,20 +63,100 @@ login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'index'
 
-# Rate Limiter 설정
+# Rate Limiter 설정 (API 키 요청은 키 단위, 그 외는 IP 단위 - 카운터는 워커 간 공유)
+def rate_limit_key():
+    api_key = request.headers.get('X-API-Key')
+    if api_key:
+        key_id = api_key_cache.resolve(api_key)
+        if key_id:
+            return f'api_key:{key_id}'
+    return get_remote_address()
+
+# 키 없는/잘못된 키 요청과 일반 라우트의 IP 단위 한도
+ANONYMOUS_RATE_LIMIT = '200 per day;50 per hour'
+
+def api_key_rate_limit():
+    """요청한 API 키의 한도 (메모리 캐시 - DB 조회 없음) - 키가 확인되지 않으면 IP 단위 기본 한도"""
+    key_id = api_key_cache.resolve(request.headers.get('X-API-Key', ''))
+    if not key_id:
+        return ANONYMOUS_RATE_LIMIT
+    # 한도 없는 키는 api_key_unlimited로 제외되므로 여기 값은 쓰이지 않음
+    return api_key_cache.quota(key_id) or app.config['API_RATE_LIMIT_DEFAULT'] or ANONYMOUS_RATE_LIMIT
+
+def api_key_unlimited():
+    """확인된 키에 ApiKey.rate_limit도 API_RATE_LIMIT_DEFAULT도 없으면 한도 없음"""
+    key_id = api_key_cache.resolve(request.headers.get('X-API-Key', ''))
+    return bool(key_id) and not (api_key_cache.quota(key_id) or app.config['API_RATE_LIMIT_DEFAULT'])
+
 limiter = Limiter(
     app=app,
-    key_func=get_remote_address,
-    default_limits=["200 per day", "50 per hour"]
+    key_func=rate_limit_key,
+    default_limits=[ANONYMOUS_RATE_LIMIT]
 )
 
+@limiter.request_filter
+def admin_session_exempt():
+    """로그인한 관리자의 화면/관리 API 요청은 기본 한도에서 제외 (API 키 요청은 키별 한도 그대로)
+
+    회원 목록 페이지 로드, 알림 스트림 재연결 등으로 관리자가 한 시간 동안 잠기지 않도록 한다.
+    """
+    return current_user.is_authenticated and not request.headers.get('X-API-Key')
+
 db.init_app(app)
 
+# 백엔드별 엔진 설정 적용 (SQLite는 연결마다 PRAGMA 설정)
+with app.app_context():
+    if db.engine.dialect.name == 'sqlite':
+        @event.listens_for(db.engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in SQLITE_PRAGMAS.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+            cursor.close()
+        
+        with db.engine.connect() as conn:
+            effective = {
+                name: conn.exec_driver_sql(f'PRAGMA {name}').scalar()
+                for name in SQLITE_PRAGMAS
+            }
+        logger.info(f"Engine profile: sqlite {effective}")
+    elif db.engine.dialect.name == 'postgresql':
+        with db.engine.connect() as conn:
+            statement_timeout = conn.exec_driver_sql('SHOW statement_timeout').scalar()
+        logger.info(
+            f"Engine profile: postgresql pool_size={db.engine.pool.size()} "
+            f"max_overflow={db.engine.pool._max_overflow} "
+            f"pre_ping={db.engine.pool._pre_ping} recycle={db.engine.pool._recycle} "
+            f"statement_timeout={statement_timeout} workers={app.config['WEB_CONCURRENCY']}"
+        )
+
+# CID 검증 캐시 (워커별)
+verify_cache = VerificationCache(
+    max_size=app.config['VERIFY_CACHE_SIZE'],
+    ttl=app.config['VERIFY_CACHE_TTL']
+)
+
+# 활성 API 키 캐시 (last_used_at은 주기적으로 일괄 반영)
+api_key_cache = ApiKeyCache(app)
+
+# API 사용량/오류율 감시 + ApiLog 비동기 일괄 기록기
+usage_monitor = UsageMonitor(app)
+api_log_writer = ApiLogWriter(app, monitor=usage_monitor)
+payload_policy = PayloadPolicy(app)
+
+# 통계 개요 스냅샷 캐시
+stats_cache = SnapshotCache(app)
+
+# /api/login 세션 토큰 서명/검증 + 거부 목록 (워커별 메모리)
+session_tokens = SessionTokens(app)
+
 # 데이터베이스 초기화
 with app.app_context():
     try:
         logger.info("Initializing database...")
         db.create_all()
+        if app.config['AUTO_MIGRATE']:
+            run_migrations(db.engine)
         logger.info("Database initialization completed")
     except Exception as e:
         logger.error(f"Database initialization failed: {str(e)}")
@@ -68,9 +172,30 @@ if not os.path.exists(BACKUP_DIR):
     os.makedirs(BACKUP_DIR)
     logger.info(f"Created backup directory: {BACKUP_DIR}")
 
-# 백업 스케줄러 설정 (배포용으로 비활성화)
-# scheduler = BackgroundScheduler()
-# scheduler.start()
+# 청크 단위 중복 제거 백업 저장소 (BACKUP_DIR/chunks, BACKUP_DIR/manifests)
+backup_store = BackupStore(
+    BACKUP_DIR,
+    chunk_size=app.config['BACKUP_CHUNK_SIZE'],
+    compress_level=app.config['BACKUP_COMPRESS_LEVEL']
+)
+
+# 복원 중 쓰기 요청 대기 + 복원 후 워커별 연결 풀/캐시 초기화
+restore_gate = RestoreGate(app, state_dir=BACKUP_DIR)
+restore_gate.on_restore(verify_cache.clear)
+restore_gate.on_restore(api_key_cache.invalidate)
+restore_gate.on_restore(stats_cache.invalidate)
+restore_gate.on_restore(session_tokens.invalidate)
+
+# 주기 작업 스케줄러 (작업 등록은 아래 함수 정의 후)
+scheduler = Scheduler(app)
+
+# 알림 센터 + 알림 개수 SSE 스트림 (변경 알림은 워커 간 파일 표시로 전달)
+notification_broker = NotificationBroker(app)
+app.register_blueprint(notifications_bp)
+# 알림 스트림은 재연결마다 한도를 차감하지 않음 (동시 연결 수는 NOTIFICATION_MAX_STREAMS로 제한)
+limiter.exempt(app.view_functions['notifications.notification_stream'])
+# 알림 목록은 스크롤할 때마다 페이지를 불러오므로 한도에서 제외 (관리자 로그인 필요)
+limiter.exempt(app.view_functions['notifications.get_notifications'])
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -101,26 +226,60 @@ def require_api_key(f):
         if not api_key:
             return jsonify({'error': 'API key is required.'}), 401
         
-        key = ApiKey.query.filter_by(key=api_key, is_active=True).first()
-        if not key:
+        key_id = api_key_cache.resolve(api_key)
+        if not key_id:
             return jsonify({'error': 'Invalid API key.'}), 401
+        g.api_key_id = key_id
         
-        # API key usage time update
-        key.last_used_at = datetime.utcnow()
-        db.session.commit()
+        # API key usage time update (write-behind)
+        api_key_cache.touch(key_id)
         
-        # API request logging
-        log = ApiLog(
-            api_key_id=key.id,
-            endpoint=request.path,
-            method=request.method,
-            request_data=request.get_data(as_text=True),
-            ip_address=request.remote_addr,
-            user_agent=request.user_agent.string
-        )
-        db.session.add(log)
-        db.session.commit()
+        try:
+            response = app.make_response(f(*args, **kwargs))
+        except HTTPException as e:
+            log_api_request(key_id, e.code or 500, e.description)
+            raise
+        except Exception as e:
+            # 처리 중 예외도 500으로 기록 (오류율 감시/오류 본문 전체 기록 대상) 후 그대로 전파
+            log_api_request(key_id, 500, f'{type(e).__name__}: {str(e)}')
+            raise
         
+        log_api_request(key_id, response.status_code,
+                        None if response.is_streamed else response.get_data(as_text=True))
+        return response
+    return limiter.limit(api_key_rate_limit, key_func=rate_limit_key,
+                         exempt_when=api_key_unlimited)(decorated_function)
+
+def log_api_request(key_id, status_code, response_data):
+    """API request logging (background batch insert, 본문은 엔드포인트별 정책 적용)"""
+    request_data, response_data = payload_policy.apply(
+        request.path,
+        status_code,
+        request.get_data(as_text=True),
+        response_data
+    )
+    api_log_writer.submit(
+        api_key_id=key_id,
+        endpoint=request.path,
+        method=request.method,
+        request_data=request_data,
+        response_data=response_data,
+        status_code=status_code,
+        ip_address=request.remote_addr,
+        user_agent=request.user_agent.string
+    )
+
+def require_session_token(f):
+    """Authorization: Bearer <토큰> 확인 (서명/유효 기간/거부 목록 - DB 조회 없음)"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not token:
+            return jsonify({'error': 'Session token is required.'}), 401
+        try:
+            g.session_claims = session_tokens.verify(token.strip())
+        except InvalidToken as e:
+            return jsonify({'error': str(e)}), 401
         return f(*args, **kwargs)
     return decorated_function
 
@@ -226,6 +385,7 @@ def add_member_simple():
             db.session.add(cid)
         
         db.session.commit()
+        verify_cache.invalidate(cid_value.strip())
         
         return f"""
         <h1>Success!</h1>
@@ -270,14 +430,95 @@ def change_password():
 @app.route('/dashboard')
 @login_required
 def dashboard():
-    members = Member.query.all()
-    return render_template('dashboard.html', members=members)
+    # 회원 목록은 페이지 단위로 /api/members에서 불러옴
+    return render_template('dashboard.html')
+
+# 회원 목록 정렬 기준 (keyset 페이지네이션용)
+MEMBER_SORT_COLUMNS = {
+    'id': Member.id,
+    'expiry_date': Member.expiry_date,
+    'registration_date': Member.registration_date
+}
 
 @app.route('/api/members', methods=['GET'])
 @login_required
 def get_members():
-    members = Member.query.all()
-    return jsonify([member.to_dict() for member in members])
+    """회원 목록
+
+    limit/cursor가 없으면 전체 목록(배열), 있으면 keyset 페이지
+    ({members, next_cursor, has_more})를 반환한다.
+    정렬: sort=id|expiry_date|registration_date, order=asc|desc
+    필터: expired=true|false, expiring_within=<일>, phone=<전화번호>
+    """
+    sort = request.args.get('sort', 'id')
+    order = request.args.get('order', 'asc')
+    if sort not in MEMBER_SORT_COLUMNS or order not in ('asc', 'desc'):
+        return jsonify({'error': 'Invalid sort option.'}), 400
+    
+    sort_column = MEMBER_SORT_COLUMNS[sort]
+    descending = order == 'desc'
+    
+    # CID는 페이지당 IN 쿼리 1회로 함께 로드
+    query = Member.query.options(selectinload(Member.cids))
+    
+    now = datetime.now()
+    expired = request.args.get('expired')
+    if expired == 'true':
+        query = query.filter(Member.expiry_date < now)
+    elif expired == 'false':
+        query = query.filter(Member.expiry_date >= now)
+    
+    expiring_within = request.args.get('expiring_within', type=int)
+    if expiring_within is not None:
+        query = query.filter(
+            Member.expiry_date >= now,
+            Member.expiry_date < now + timedelta(days=expiring_within)
+        )
+    
+    phone = request.args.get('phone')
+    if phone:
+        query = query.filter(Member.phone == phone)
+    
+    if descending:
+        query = query.order_by(sort_column.desc(), Member.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), Member.id.asc())
+    
+    limit = request.args.get('limit', type=int)
+    cursor = request.args.get('cursor')
+    if limit is None and cursor is None:
+        return jsonify([member.to_dict() for member in query.all()])
+    
+    limit = min(max(limit or app.config['MEMBERS_PAGE_SIZE'], 1), app.config['MEMBERS_PAGE_MAX'])
+    
+    if cursor:
+        try:
+            last_value, last_id = decode_cursor(cursor)
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid cursor.'}), 400
+        
+        if sort == 'id':
+            after = Member.id < last_id if descending else Member.id > last_id
+        elif descending:
+            after = or_(sort_column < last_value, and_(sort_column == last_value, Member.id < last_id))
+        else:
+            after = or_(sort_column > last_value, and_(sort_column == last_value, Member.id > last_id))
+        query = query.filter(after)
+    
+    members = query.limit(limit + 1).all()
+    has_more = len(members) > limit
+    members = members[:limit]
+    
+    next_cursor = None
+    if has_more:
+        last = members[-1]
+        next_cursor = encode_cursor([getattr(last, sort), last.id])
+    
+    return jsonify({
+        'members': [member.to_dict() for member in members],
+        'next_cursor': next_cursor,
+        'has_more': has_more
+    })
 
 @app.route('/api/members/<int:id>', methods=['GET'])
 @login_required
@@ -290,7 +531,7 @@ def get_member(id):
 def add_member():
     try:
         data = request.json
-        print(f"[DEBUG] Received member data: {data}")
+        print(f"[DEBUG] Received member data: { {k: v for k, v in (data or {}).items() if k != 'pw'} }")
         
         # 필수 필드 검증
         required_fields = ['name', 'phone', 'registration_date', 'expiry_date']
@@ -324,6 +565,8 @@ def add_member():
             deposit_amount=data.get('deposit_amount', 0),
             referrer=data.get('referrer', '')
         )
+        if data.get('pw'):
+            member.set_password(data['pw'])
         db.session.add(member)
         db.session.flush()  # member.id를 얻기 위해 flush
         
@@ -336,6 +579,7 @@ def add_member():
             db.session.add(cid)
         
         db.session.commit()
+        verify_cache.invalidate(*data.get('cids', []))
         
         # 활동 기록
         log_member_activity(
@@ -370,9 +614,11 @@ def update_member(id):
         )
     
     # 만료일 변경 확인
+    expiry_changed = False
     if 'expiry_date' in data:
         new_expiry = parse(data['expiry_date'])
-        if new_expiry != member.expiry_date:
+        expiry_changed = new_expiry != member.expiry_date
+        if expiry_changed:
             log_member_activity(
                 member.id,
                 'renewal',
@@ -385,7 +631,12 @@ def update_member(id):
     member.expiry_date = parse(data['expiry_date'])
     member.deposit_amount = data.get('deposit_amount', 0)
     member.referrer = data.get('referrer', '')
+    # 비밀번호는 입력한 경우에만 변경 (비워 두면 기존 비밀번호 유지)
+    password_changed = bool(data.get('pw'))
+    if password_changed:
+        member.set_password(data['pw'])
     
+    old_cids = [cid.cid_value for cid in member.cids]
     CID.query.filter_by(member_id=member.id).delete()
     
     for cid_value in data.get('cids', []):
@@ -397,14 +648,21 @@ def update_member(id):
         db.session.add(cid)
     
     db.session.commit()
+    verify_cache.invalidate(*old_cids, *data.get('cids', []))
+    # 만료일/CID/비밀번호가 바뀌면 이전에 발급된 세션 토큰 폐기 (클라이언트는 다시 로그인)
+    if expiry_changed or password_changed or set(old_cids) - set(data.get('cids', [])):
+        session_tokens.revoke_subject('member', member.id)
     return jsonify(member.to_dict())
 
 @app.route('/api/members/<int:id>', methods=['DELETE'])
 @login_required
 def delete_member(id):
     member = Member.query.get_or_404(id)
+    cid_values = [cid.cid_value for cid in member.cids]
     db.session.delete(member)
     db.session.commit()
+    verify_cache.invalidate(*cid_values)
+    session_tokens.revoke_subject('member', id)
     return '', 204
 
 @app.route('/api/login', methods=['POST'])
@@ -421,41 +679,61 @@ def api_login():
         return jsonify({'error': 'Invalid CID'}), 401
     
     member = cid_record.member
-    if member.expiry_date < datetime.utcnow():
+    # 비밀번호가 설정된 회원만 확인 (MEMBER_PASSWORD_REQUIRED를 켜면 미설정 회원도 거부)
+    if member.password_hash or app.config['MEMBER_PASSWORD_REQUIRED']:
+        if not member.check_password(pw):
+            return jsonify({'error': 'Invalid credentials'}), 401
+    
+    if member.expiry_date < datetime.now():
         return jsonify({'error': 'Subscription expired'}), 401
     
+    token, token_expires_at = session_tokens.issue(member.id, cid_record.cid_value, member.expiry_date)
     return jsonify({
-        'token': 'dummy-token',  # 실제 구현에서는 적절한 토큰 생성 필요
+        'token': token,
+        'token_expires_at': datetime.utcfromtimestamp(token_expires_at).strftime('%Y-%m-%dT%H:%M:%SZ'),
         'expiry_date': member.expiry_date.strftime('%Y-%m-%d')
     })
 
-@app.route('/api/export', methods=['GET'])
+@app.route('/api/session', methods=['GET'])
+@require_session_token
+def get_session():
+    """세션 토큰 검증 (토큰에 담긴 회원/CID/만료일 반환)"""
+    claims = g.session_claims
+    return jsonify({
+        'valid': True,
+        'member_id': claims['m'],
+        'cid': claims['c'],
+        'expiry_date': datetime.fromtimestamp(claims['x']).strftime('%Y-%m-%d'),
+        'token_expires_at': datetime.utcfromtimestamp(claims['e']).strftime('%Y-%m-%dT%H:%M:%SZ')
+    })
+
+@app.route('/api/session', methods=['DELETE'])
+@require_session_token
+def delete_session():
+    """세션 토큰 폐기 (로그아웃)"""
+    session_tokens.revoke(g.session_claims)
+    return '', 204
+
+@app.route('/api/session/keys', methods=['GET'])
 @login_required
-def export_excel():
-    members = Member.query.all()
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "회원 목록"
-    
-    # 스타일 설정
-    header_font = Font(bold=True)
-    center_alignment = Alignment(horizontal='center', vertical='center')
-    
-    # 헤더 추가
-    headers = ['번호', '이름', '전화번호', '등록일', '만료일', '입금액', '추천인', 'CID 목록']
-    ws.append(headers)
-    
-    # 헤더 스타일 적용
-    for cell in ws[1]:
-        cell.font = header_font
-        cell.alignment = center_alignment
+def get_session_token_status():
+    return jsonify(session_tokens.stats())
+
+# 내보내기 헤더 / 열 너비 (쓰기 전용 모드에서는 셀 길이를 다시 훑을 수 없으므로 고정)
+EXPORT_HEADERS = ['번호', '이름', '전화번호', '등록일', '만료일', '입금액', '추천인', 'CID 목록']
+EXPORT_COLUMN_WIDTHS = [15, 15, 15, 15, 15, 15, 15, 50]
+
+def export_rows():
+    """내보내기용 회원 행 (페이지 단위로 읽어 메모리 사용량 일정)"""
+    members = Member.query.options(selectinload(Member.cids))\
+        .order_by(Member.id)\
+        .yield_per(app.config['EXPORT_BATCH_SIZE'])
     
-    # 데이터 추가
     for idx, member in enumerate(members, 1):
         # 금액에 천단위 콤마 추가
         deposit_amount = format(member.deposit_amount, ',') + '원' if member.deposit_amount else '0원'
         
-        row = [
+        yield [
             idx,
             member.name,
             member.phone,
@@ -465,40 +743,84 @@ def export_excel():
             member.referrer,
             ', '.join([cid.cid_value for cid in member.cids])
         ]
-        ws.append(row)
+
+@app.route('/api/export', methods=['GET'])
+@login_required
+def export_excel():
+    """회원 목록 내보내기 (format=xlsx|csv)"""
+    export_format = request.args.get('format', 'xlsx')
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    if export_format == 'csv':
+        def generate():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            # 엑셀에서 한글이 깨지지 않도록 BOM 추가
+            buffer.write('\ufeff')
+            writer.writerow(EXPORT_HEADERS)
+            for row in export_rows():
+                writer.writerow(row)
+                if buffer.tell() >= 64 * 1024:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
         
-        # 행 데이터 중앙 정렬
-        for cell in ws[idx + 1]:
-            cell.alignment = center_alignment
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/csv',
+            headers={'Content-Disposition': f'attachment; filename=members_export_{timestamp}.csv'}
+        )
     
-    # 열 너비 자동 조정 (최소 15, CID 열은 더 넓게)
-    for idx, column in enumerate(ws.columns):
-        max_length = 0
-        column = list(column)
-        for cell in column:
-            try:
-                length = len(str(cell.value))
-                if length > max_length:
-                    max_length = length
-            except:
-                pass
-        # CID 열은 더 넓게 설정
-        if idx == 7:  # CID 열
-            adjusted_width = max(max_length + 2, 50)  # 최소 50
-        else:
-            adjusted_width = max(max_length + 2, 15)  # 최소 15
-        ws.column_dimensions[column[0].column_letter].width = adjusted_width
+    if export_format != 'xlsx':
+        return jsonify({'error': 'Invalid export format.'}), 400
     
-    # 파일 저장
-    filename = f'members_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-    wb.save(filename)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("회원 목록")
     
-    return send_file(filename, as_attachment=True)
+    # 열 너비는 행 추가 전에 설정해야 함 (CID 열은 더 넓게)
+    for idx, width in enumerate(EXPORT_COLUMN_WIDTHS, 1):
+        ws.column_dimensions[get_column_letter(idx)].width = width
+    
+    # 스타일 설정
+    header_font = Font(bold=True)
+    center_alignment = Alignment(horizontal='center', vertical='center')
+    
+    # 헤더 추가
+    header_cells = []
+    for header in EXPORT_HEADERS:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = header_font
+        cell.alignment = center_alignment
+        header_cells.append(cell)
+    ws.append(header_cells)
+    
+    # 데이터 추가 (행 데이터 중앙 정렬)
+    for row in export_rows():
+        cells = []
+        for value in row:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.alignment = center_alignment
+            cells.append(cell)
+        ws.append(cells)
+    
+    # 작업 디렉토리에 파일을 남기지 않음 (큰 파일만 임시 파일로 넘어가고 응답 후 삭제)
+    output = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    wb.save(output)
+    output.seek(0)
+    
+    return send_file(
+        output,
+        as_attachment=True,
+        download_name=f'members_export_{timestamp}.xlsx',
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
 
 # API 키 관리 엔드포인트
 @app.route('/api/keys', methods=['GET'])
 @login_required
 def list_api_keys():
+    api_key_cache.flush()
     keys = ApiKey.query.all()
     return jsonify([key.to_dict() for key in keys])
 
@@ -509,21 +831,53 @@ def create_api_key():
     if not data or 'name' not in data:
         return jsonify({'error': 'Name is required.'}), 400
     
+    rate_limit = data.get('rate_limit') or None
+    if rate_limit and not is_valid_rate_limit(rate_limit):
+        return jsonify({'error': 'Invalid rate limit.'}), 400
+    
     key = ApiKey(
         key=ApiKey.generate_key(),
-        name=data['name']
+        name=data['name'],
+        rate_limit=rate_limit
     )
     db.session.add(key)
     db.session.commit()
+    api_key_cache.reload()
     
     return jsonify(key.to_dict()), 201
 
+@app.route('/api/keys/<int:id>', methods=['PUT'])
+@login_required
+def update_api_key(id):
+    """API 키 이름/호출 한도 변경 (rate_limit: '1000 per hour;20000 per day', 빈 값이면 기본값)"""
+    key = ApiKey.query.get_or_404(id)
+    data = request.json or {}
+    
+    if 'rate_limit' in data:
+        rate_limit = data['rate_limit'] or None
+        if rate_limit and not is_valid_rate_limit(rate_limit):
+            return jsonify({'error': 'Invalid rate limit.'}), 400
+        key.rate_limit = rate_limit
+    if data.get('name'):
+        key.name = data['name']
+    
+    db.session.commit()
+    api_key_cache.reload()
+    return jsonify(key.to_dict())
+
+def is_valid_rate_limit(value):
+    try:
+        return bool(parse_many(value))
+    except ValueError:
+        return False
+
 @app.route('/api/keys/<int:id>', methods=['DELETE'])
 @login_required
 def delete_api_key(id):
     key = ApiKey.query.get_or_404(id)
     key.is_active = False
     db.session.commit()
+    api_key_cache.reload()
     return '', 204
 
 # 폰번호 로그인 API 엔드포인트 (메인)
@@ -600,69 +954,178 @@ def test_status():
 @require_api_key
 def verify_cid():
     data = request.json
-    if not data or 'cid' not in data:
+    if not isinstance(data, dict) or 'cid' not in data:
         return jsonify({'error': 'CID is required.'}), 400
     
-    cid = CID.query.filter_by(cid_value=data['cid']).first()
-    if not cid:
-        return jsonify({
+    if not is_valid_cid(data['cid']):
+        return jsonify({'error': 'CID must be a non-empty string.'}), 400
+    
+    record = lookup_verification(data['cid'])
+    return jsonify(verification_result(record))
+
+@app.route('/api/v1/verify/batch', methods=['POST'])
+@require_api_key
+def verify_cid_batch():
+    """여러 CID 일괄 검증 (요청당 ApiLog 1건)"""
+    data = request.json
+    cid_values = data.get('cids') if isinstance(data, dict) else None
+    if not isinstance(cid_values, list) or not cid_values:
+        return jsonify({'error': 'CID list is required.'}), 400
+    
+    max_size = app.config['VERIFY_BATCH_MAX']
+    if len(cid_values) > max_size:
+        return jsonify({'error': f'Too many CIDs (max {max_size}).'}), 400
+    
+    if not all(is_valid_cid(cid_value) for cid_value in cid_values):
+        return jsonify({'error': 'CID must be a non-empty string.'}), 400
+    
+    records = lookup_verifications(cid_values)
+    results = []
+    for cid_value in cid_values:
+        result = verification_result(records[cid_value])
+        result['cid'] = cid_value
+        results.append(result)
+    
+    return jsonify({
+        'results': results,
+        'count': len(results),
+        'valid_count': sum(1 for result in results if result['valid'])
+    })
+
+def is_valid_cid(value):
+    """검증 요청의 CID 값 확인 (캐시/IN 조회 전에 - 리스트/dict 등은 400)"""
+    return isinstance(value, str) and bool(value.strip())
+
+def verification_result(record):
+    """검증 정보 -> /api/v1/verify 응답 형식"""
+    if not record:
+        return {
             'valid': False,
             'message': 'Unregistered CID.'
-        })
+        }
     
-    if not cid.is_active:
-        return jsonify({
+    if not record.is_active:
+        return {
             'valid': False,
             'message': 'Deactivated CID.'
-        })
+        }
     
-    member = Member.query.get(cid.member_id)
-    if member.expiry_date < datetime.now():
-        return jsonify({
+    if record.expiry_date < datetime.now():
+        return {
             'valid': False,
             'message': 'Service period has expired.'
-        })
+        }
     
-    return jsonify({
+    return {
         'valid': True,
         'message': 'Verified.',
-        'expiry_date': member.expiry_date.strftime('%Y-%m-%d'),
-        'member_name': member.name,
-        'member_phone': member.phone
-    })
+        'expiry_date': record.expiry_date.strftime('%Y-%m-%d'),
+        'member_name': record.name,
+        'member_phone': record.phone
+    }
+
+def lookup_verification(cid_value):
+    """CID 검증 정보 조회 (캐시 우선, 미스 시 CID-Member 조인 1회)"""
+    return lookup_verifications([cid_value])[cid_value]
+
+def lookup_verifications(cid_values):
+    """여러 CID 검증 정보 조회 - 캐시에 없는 CID만 IN 쿼리 1회로 조회"""
+    records = {}
+    missing = []
+    for cid_value in set(cid_values):
+        record = verify_cache.get(cid_value)
+        if record is MISS:
+            missing.append(cid_value)
+        else:
+            records[cid_value] = record
+    
+    if missing:
+        rows = db.session.query(
+            CID.cid_value,
+            CID.is_active,
+            Member.expiry_date,
+            Member.name,
+            Member.phone
+        ).join(Member, CID.member_id == Member.id).filter(
+            CID.cid_value.in_(missing)
+        ).all()
+        
+        found = {row[0]: VerificationRecord(*row[1:]) for row in rows}
+        for cid_value in missing:
+            record = found.get(cid_value)
+            verify_cache.set(cid_value, record)
+            records[cid_value] = record
+    
+    return records
 
 @app.route('/api/logs', methods=['GET'])
 @login_required
 def get_api_logs():
+    """API 로그 목록 (본문 제외 - 본문은 /api/logs/<id> 또는 ?payload=1)"""
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 50, type=int)
+    include_payload = request.args.get('payload', type=int) == 1
     
-    logs = ApiLog.query.order_by(ApiLog.timestamp.desc()).paginate(
+    query = ApiLog.query.options(joinedload(ApiLog.api_key))
+    if not include_payload:
+        query = query.options(defer(ApiLog.request_data), defer(ApiLog.response_data))
+    logs = query.order_by(ApiLog.timestamp.desc()).paginate(
         page=page, per_page=per_page, error_out=False
     )
     
     return jsonify({
-        'logs': [log.to_dict() for log in logs.items],
+        'logs': [log.to_dict(include_payload=include_payload) for log in logs.items],
         'total': logs.total,
         'pages': logs.pages,
         'current_page': logs.page
     })
 
+@app.route('/api/logs/<int:id>', methods=['GET'])
+@login_required
+def get_api_log(id):
+    """API 로그 한 건 (요청/응답 본문 포함)"""
+    log = ApiLog.query.get_or_404(id)
+    return jsonify(log.to_dict())
+
 def create_backup(description=None, is_auto=False):
-    """데이터베이스 백업 생성"""
+    """데이터베이스 백업 생성 (SQLite 온라인 백업 / 그 외 논리 덤프)"""
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_filename = f'backup_{timestamp}.db'
-    backup_path = os.path.join(BACKUP_DIR, backup_filename)
+    backup_filename = f'backup_{timestamp}{backup_extension(db.engine)}'
+    if backup_store.exists(backup_filename):
+        backup_filename = f'backup_{datetime.now().strftime("%Y%m%d_%H%M%S_%f")}{backup_extension(db.engine)}'
     
-    # 데이터베이스 파일 복사
-    shutil.copy2('quicker.db', backup_path)
+    # 임시 파일로 스냅샷을 만든 뒤 저장소에는 바뀐 청크만 기록
+    fd, snapshot_path = tempfile.mkstemp(dir=BACKUP_DIR, suffix='.snapshot')
+    os.close(fd)
+    try:
+        started = datetime.utcnow()
+        result = backup_database(
+            db.engine,
+            snapshot_path,
+            pages_per_step=app.config['BACKUP_PAGES_PER_STEP'],
+            step_sleep=app.config['BACKUP_STEP_SLEEP_MS'] / 1000,
+            batch_size=app.config['EXPORT_BATCH_SIZE']
+        )
+        stored = backup_store.put(snapshot_path, backup_filename, line_chunks=backup_filename.endswith('.jsonl'))
+        duration_ms = int((datetime.utcnow() - started).total_seconds() * 1000)
+    finally:
+        if os.path.exists(snapshot_path):
+            os.remove(snapshot_path)
+    logger.info(
+        f"Backup created: {backup_filename} ({result['size']} bytes, "
+        f"{stored['new_chunks']}/{stored['chunks']} new chunks, {stored['stored_size']} bytes written, {duration_ms}ms)"
+    )
     
     # 백업 정보 저장
     backup = Backup(
         filename=backup_filename,
-        size=os.path.getsize(backup_path),
+        size=result['size'],
+        stored_size=stored['stored_size'],
         description=description,
-        is_auto=is_auto
+        is_auto=is_auto,
+        duration_ms=duration_ms,
+        page_count=result['page_count'],
+        checksum=result['checksum']
     )
     db.session.add(backup)
     db.session.commit()
@@ -670,83 +1133,161 @@ def create_backup(description=None, is_auto=False):
     return backup
 
 def restore_backup(backup_id):
-    """백업에서 데이터베이스 복원"""
+    """백업에서 데이터베이스 복원
+    
+    스냅샷을 임시 파일로 꺼내 무결성을 검사한 뒤 SQLite 백업 API로 한 번에 교체한다.
+    교체하는 동안 모든 워커의 쓰기 요청은 restore_gate에서 대기하고,
+    끝나면 각 워커가 연결 풀과 캐시를 버린다.
+    """
     backup = Backup.query.get_or_404(backup_id)
     backup_path = os.path.join(BACKUP_DIR, backup.filename)
     
-    if not os.path.exists(backup_path):
+    if db.engine.dialect.name != 'sqlite' or not backup.filename.endswith('.db'):
+        raise ValueError('SQLite 백업만 복원할 수 있습니다.')
+    if not backup_store.exists(backup.filename) and not os.path.exists(backup_path):
         raise FileNotFoundError('백업 파일을 찾을 수 없습니다.')
     
     # 데이터베이스 연결 해제
     db.session.remove()
     
-    # 현재 데이터베이스 파일 백업
+    # 스냅샷 준비 + 검사 (이전 방식의 전체 복사 파일도 지원)
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    current_backup = f'pre_restore_{timestamp}.db'
-    shutil.copy2('quicker.db', os.path.join(BACKUP_DIR, current_backup))
+    staged_path = os.path.join(BACKUP_DIR, f'restore_{timestamp}.db')
+    if backup_store.exists(backup.filename):
+        backup_store.restore(backup.filename, staged_path)
+    else:
+        shutil.copy2(backup_path, staged_path)
     
-    # 백업 파일 복원
-    shutil.copy2(backup_path, 'quicker.db')
+    try:
+        verify_sqlite_snapshot(staged_path, required_tables=('member', 'cid', 'admin'))
+        
+        # 현재 데이터베이스 백업 (저장소에 변경분만 기록)
+        current_backup = f'pre_restore_{timestamp}.db'
+        snapshot_path = os.path.join(BACKUP_DIR, current_backup)
+        snapshot = backup_database(db.engine, snapshot_path)
+        try:
+            stored = backup_store.put(snapshot_path, current_backup)
+        finally:
+            os.remove(snapshot_path)
+        
+        # 교체 후 스키마를 현재 코드에 맞춤 (이전 버전 백업일 수 있음)
+        with restore_gate.hold():
+            started = datetime.utcnow()
+            restore_sqlite_database(db.engine, staged_path)
+            db.create_all()
+            run_migrations(db.engine)
+            
+            # 복원된 Backup 테이블에는 복원 전 스냅샷과 이 백업 이후의 백업이 없으므로 다시 등록
+            db.session.add(Backup(
+                filename=current_backup,
+                size=snapshot['size'],
+                stored_size=stored['stored_size'],
+                description=f'복원 전 자동 스냅샷 ({backup.filename} 복원)',
+                is_auto=False,
+                page_count=snapshot['page_count'],
+                checksum=snapshot['checksum']
+            ))
+            db.session.commit()
+            sync_backup_records()
+            logger.info(f"Restored {backup.filename} in {int((datetime.utcnow() - started).total_seconds() * 1000)}ms")
+    finally:
+        os.remove(staged_path)
     
     return True
 
+def sync_backup_records():
+    """저장소에는 있지만 Backup 행이 없는 스냅샷을 다시 등록 - 등록한 수 반환
+
+    복원하면 Backup 테이블이 복원 시점으로 돌아가므로, 그 뒤에 만든 백업도
+    목록에서 보이고 삭제/복원/정리될 수 있게 manifest 정보로 행을 만든다.
+    """
+    known = {filename for filename, in db.session.query(Backup.filename)}
+    added = 0
+    for manifest in backup_store.manifests():
+        if manifest['name'] in known:
+            continue
+        db.session.add(Backup(
+            filename=manifest['name'],
+            created_at=datetime.fromisoformat(manifest['created_at']),
+            size=manifest['size'],
+            description='복원 후 다시 등록된 백업',
+            is_auto=False,
+            checksum=manifest['checksum']
+        ))
+        added += 1
+    db.session.commit()
+    return added
+
 def cleanup_old_backups():
-    """오래된 자동 백업 삭제"""
+    """오래된 자동 백업 삭제 (활성 스케줄 중 가장 짧은 보관 기간 기준)"""
+    retention_days = db.session.query(
+        func.min(BackupSchedule.retention_days)
+    ).filter(BackupSchedule.is_active == True).scalar()
+    if retention_days is None:
+        return 0
+    
+    retention_date = datetime.utcnow() - timedelta(days=retention_days)
+    old_backups = Backup.query.filter(
+        Backup.is_auto == True,
+        Backup.created_at < retention_date
+    ).all()
+    
+    for backup in old_backups:
+        remove_backup_files(backup)
+        db.session.delete(backup)
+    db.session.commit()
+    
+    # 더 이상 참조되지 않는 청크 정리
+    removed, freed = backup_store.gc()
+    if old_backups:
+        logger.info(f"Removed {len(old_backups)} old backups ({removed} chunks, {freed} bytes)")
+    return len(old_backups)
+
+def remove_backup_files(backup):
+    """백업 manifest 삭제 (청크는 gc에서 정리) - 이전 방식의 전체 복사 파일도 삭제"""
+    backup_store.delete(backup.filename)
+    backup_path = os.path.join(BACKUP_DIR, backup.filename)
+    if os.path.exists(backup_path):
+        os.remove(backup_path)
+
+def run_backup_schedules(now=None):
+    """예정 시각이 지난 활성 백업 스케줄 실행 (스케줄러 작업) - 생성한 백업 수 반환"""
+    now = now or datetime.now()
+    utc_offset = datetime.now() - datetime.utcnow()
+    created = 0
     for schedule in BackupSchedule.query.filter_by(is_active=True).all():
-        retention_date = datetime.utcnow() - timedelta(days=schedule.retention_days)
-        old_backups = Backup.query.filter(
-            Backup.is_auto == True,
-            Backup.created_at < retention_date
-        ).all()
-        
-        for backup in old_backups:
-            backup_path = os.path.join(BACKUP_DIR, backup.filename)
-            if os.path.exists(backup_path):
-                os.remove(backup_path)
-            db.session.delete(backup)
-        
+        slot = latest_slot(schedule.frequency, schedule.time, now)
+        # 스케줄 시각은 로컬 시각, created_at은 UTC
+        baseline = schedule.last_run or schedule.created_at + utc_offset
+        if slot is None or slot <= baseline:
+            continue
+        create_backup(description=f'자동 백업 ({schedule.frequency})', is_auto=True)
+        schedule.last_run = now
         db.session.commit()
+        created += 1
+    return created
+
+def refresh_daily_stats():
+    """확정되지 않은 일일 통계 계산 (지난 날짜는 확정, 오늘은 갱신)"""
+    end_date = date.today()
+    start_date = end_date - timedelta(days=app.config['DAILY_STATS_BACKFILL_DAYS'])
+    return DailyStats.backfill(start_date, end_date)
+
+def compact_api_usage():
+    """어제(UTC) API 사용량 집계를 원본 ApiLog로 다시 계산 (비동기 기록 중 누락분 보정)"""
+    today = datetime.combine(datetime.utcnow().date(), time.min)
+    return ApiUsageHourly.rebuild(today - timedelta(days=1), today - timedelta(hours=1),
+                                  horizon=retention_horizon(app.config, 'api_log'))
 
-def schedule_backup(schedule_id):
-    """백업 스케줄 설정 (배포용으로 비활성화)"""
-    # schedule = BackupSchedule.query.get(schedule_id)
-    # if not schedule or not schedule.is_active:
-    #     return
-    # 
-    # if schedule.frequency == 'daily':
-    #     trigger = CronTrigger(
-    #         hour=schedule.time.hour,
-    #         minute=schedule.time.minute
-    #     )
-    # elif schedule.frequency == 'weekly':
-    #     trigger = CronTrigger(
-    #         day_of_week='mon',
-    #         hour=schedule.time.hour,
-    #         minute=schedule.time.minute
-    #     )
-    # elif schedule.frequency == 'monthly':
-    #     trigger = CronTrigger(
-    #         day=1,
-    #         hour=schedule.time.hour,
-    #         minute=schedule.time.minute
-    #     )
-    # else:
-    #     return
-    # 
-    # job_id = f'backup_schedule_{schedule_id}'
-    # if job_id in scheduler.get_jobs():
-    #     scheduler.remove_job(job_id)
-    # 
-    # scheduler.add_job(
-    #     func=lambda: create_backup(
-    #         description=f'자동 백업 ({schedule.frequency})',
-    #         is_auto=True
-    #     ),
-    #     trigger=trigger,
-    #     id=job_id,
-    #     name=f'Backup Schedule {schedule_id}'
-    # )
-    pass
+scheduler.add_job('backup_schedules', run_backup_schedules, interval=0)
+scheduler.add_job('cleanup_old_backups', cleanup_old_backups, at=time(0, 0))
+scheduler.add_job('daily_stats', refresh_daily_stats, interval=app.config['DAILY_STATS_REFRESH'])
+scheduler.add_job('api_usage_compaction', compact_api_usage, at=time(0, 10))
+scheduler.add_job('expiry_sweep', sweep_expiring_members, interval=app.config['EXPIRY_SWEEP_INTERVAL'])
+scheduler.add_job('retention', lambda: apply_retention(app.config), at=time(0, 30))
+scheduler.add_job('unread_notifications', reconcile_unread_notifications,
+                  interval=app.config['NOTIFICATION_RECONCILE_INTERVAL'])
+scheduler.start()
 
 # 백업 관련 API 엔드포인트
 @app.route('/api/backups', methods=['GET'])
@@ -755,6 +1296,14 @@ def list_backups():
     backups = Backup.query.order_by(Backup.created_at.desc()).all()
     return jsonify([backup.to_dict() for backup in backups])
 
+@app.route('/api/backups/storage', methods=['GET'])
+@login_required
+def get_backup_storage():
+    """백업 저장소 사용량 (스냅샷 원본 합계 대비 실제 저장 크기)"""
+    stats = backup_store.stats()
+    stats['logical_size'] = db.session.query(func.coalesce(func.sum(Backup.size), 0)).scalar()
+    return jsonify(stats)
+
 @app.route('/api/backups', methods=['POST'])
 @login_required
 def create_backup_api():
@@ -771,12 +1320,10 @@ def delete_backup(id):
     if backup.is_auto:
         return jsonify({'error': 'Automatic backup cannot be deleted.'}), 400
     
-    backup_path = os.path.join(BACKUP_DIR, backup.filename)
-    if os.path.exists(backup_path):
-        os.remove(backup_path)
-    
+    remove_backup_files(backup)
     db.session.delete(backup)
     db.session.commit()
+    backup_store.gc()
     
     return '', 204
 
@@ -815,9 +1362,6 @@ def create_backup_schedule():
     db.session.add(schedule)
     db.session.commit()
     
-    # 백업 스케줄 설정
-    schedule_backup(schedule.id)
-    
     return jsonify(schedule.to_dict()), 201
 
 @app.route('/api/backup-schedules/<int:id>', methods=['PUT'])
@@ -840,44 +1384,28 @@ def update_backup_schedule(id):
     
     db.session.commit()
     
-    # 백업 스케줄 업데이트 (배포용으로 비활성화)
-    # if schedule.is_active:
-    #     schedule_backup(schedule.id)
-    # else:
-    #     job_id = f'backup_schedule_{schedule.id}'
-    #     if job_id in scheduler.get_jobs():
-    #         scheduler.remove_job(job_id)
-    
     return jsonify(schedule.to_dict())
 
 @app.route('/api/backup-schedules/<int:id>', methods=['DELETE'])
 @login_required
 def delete_backup_schedule(id):
     schedule = BackupSchedule.query.get_or_404(id)
-    
-    # 스케줄러에서 작업 제거 (배포용으로 비활성화)
-    # job_id = f'backup_schedule_{schedule.id}'
-    # if job_id in scheduler.get_jobs():
-    #     scheduler.remove_job(job_id)
-    
     db.session.delete(schedule)
     db.session.commit()
     
     return '', 204
 
-# 기존 스케줄 복원 (배포용으로 비활성화)
-# @app.before_first_request
-# def init_backup_schedules():
-#     for schedule in BackupSchedule.query.filter_by(is_active=True).all():
-#         schedule_backup(schedule.id)
-#     
-#     # 매일 자정에 오래된 백업 정리
-#     scheduler.add_job(
-#         func=cleanup_old_backups,
-#         trigger=CronTrigger(hour=0, minute=0),
-#         id='cleanup_old_backups',
-#         name='Cleanup Old Backups'
-#     )
+@app.route('/api/scheduler', methods=['GET'])
+@login_required
+def get_scheduler_status():
+    """스케줄러 작업 상태 (리더 여부는 현재 워커 기준)"""
+    return jsonify(scheduler.stats())
+
+@app.route('/api/archive', methods=['GET'])
+@login_required
+def get_archive_stats():
+    """보관 기간이 지나 아카이브로 옮긴 데이터 현황"""
+    return jsonify(archive_stats(app.config['ARCHIVE_DIR']))
 
 # 통계 API 엔드포인트
 @app.route('/api/stats/overview', methods=['GET'])
@@ -886,11 +1414,26 @@ def get_stats_overview():
     """전체 통계 개요"""
     days = request.args.get('days', 30, type=int)
     
-    return jsonify({
+    overview, generated_at = stats_cache.get(
+        ('overview', days),
+        lambda: build_stats_overview(days)
+    )
+    return jsonify(dict(
+        overview,
+        generated_at=datetime.fromtimestamp(generated_at).strftime('%Y-%m-%d %H:%M:%S')
+    ))
+
+def build_stats_overview(days):
+    """통계 개요 계산 (캐시 스냅샷 생성용)"""
+    api_stats = ApiLog.get_stats(days)
+    api_stats['calls_by_endpoint'] = [list(row) for row in api_stats['calls_by_endpoint']]
+    api_stats['calls_by_date'] = [[str(day), count] for day, count in api_stats['calls_by_date']]
+    
+    return {
         'members': Member.get_stats(days),
         'cids': CID.get_stats(),
-        'api': ApiLog.get_stats(days)
-    })
+        'api': api_stats
+    }
 
 @app.route('/api/stats/daily', methods=['GET'])
 @login_required
@@ -900,11 +1443,25 @@ def get_daily_stats():
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
     
-    # 누락된 날짜의 통계 계산
-    current_date = start_date
-    while current_date <= end_date:
-        DailyStats.calculate_stats(current_date)
-        current_date += timedelta(days=1)
+    # 스케줄러가 꺼져 있으면 요청에서 누락/미확정 날짜 계산
+    if not scheduler.enabled:
+        DailyStats.backfill(start_date, end_date)
+    else:
+        # 스케줄러는 최근 DAILY_STATS_BACKFILL_DAYS일만 계산하므로 그 이전 날짜와,
+        # 첫 실행 전이라 아직 없는 날짜만 여기서 계산 (확정된 날짜는 backfill이 건너뜀)
+        window_start = end_date - timedelta(days=app.config['DAILY_STATS_BACKFILL_DAYS'])
+        if start_date < window_start:
+            DailyStats.backfill(start_date, window_start - timedelta(days=1))
+        recent_start = max(start_date, window_start)
+        existing = {
+            row.date for row in db.session.query(DailyStats.date).filter(
+                DailyStats.date.between(recent_start, end_date)
+            )
+        }
+        missing = [recent_start + timedelta(days=n) for n in range((end_date - recent_start).days + 1)
+                   if recent_start + timedelta(days=n) not in existing]
+        if missing:
+            DailyStats.backfill(missing[0], missing[-1])
     
     stats = DailyStats.query.filter(
         DailyStats.date.between(start_date, end_date)
@@ -923,46 +1480,80 @@ def get_member_activity(member_id):
     
     return jsonify([activity.to_dict() for activity in activities])
 
+@app.route('/api/stats/verify-cache', methods=['GET'])
+@login_required
+def get_verify_cache_stats():
+    """CID 검증 캐시 통계 (현재 워커 기준)"""
+    stats = verify_cache.stats()
+    stats['pid'] = os.getpid()
+    return jsonify(stats)
+
+@app.route('/api/stats/api-log-writer', methods=['GET'])
+@login_required
+def get_api_log_writer_stats():
+    """ApiLog 기록 큐 상태 (현재 워커 기준)"""
+    stats = api_log_writer.stats()
+    stats['monitor'] = usage_monitor.stats()
+    stats['pid'] = os.getpid()
+    return jsonify(stats)
+
 @app.route('/api/stats/api-usage', methods=['GET'])
 @login_required
 def get_api_usage_stats():
-    """API 사용 통계"""
+    """API 사용 통계 (시간 단위 집계 테이블 기준)"""
     days = request.args.get('days', 30, type=int)
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days)
+    in_range = ApiUsageHourly.since(start_date)
+    calls = func.sum(ApiUsageHourly.count)
     
     # API 키별 사용량
     usage_by_key = db.session.query(
         ApiKey.name,
-        func.count(ApiLog.id)
-    ).join(ApiLog).filter(
-        ApiLog.timestamp >= start_date
+        calls
+    ).join(ApiUsageHourly, ApiUsageHourly.api_key_id == ApiKey.id).filter(
+        in_range
     ).group_by(ApiKey.id).all()
     
     # 시간대별 사용량
     usage_by_hour = db.session.query(
-        func.extract('hour', ApiLog.timestamp),
-        func.count(ApiLog.id)
+        func.extract('hour', ApiUsageHourly.hour),
+        calls
     ).filter(
-        ApiLog.timestamp >= start_date
+        in_range
     ).group_by(
-        func.extract('hour', ApiLog.timestamp)
+        func.extract('hour', ApiUsageHourly.hour)
     ).all()
     
-    # 상태 코드별 분포
+    # 상태 코드별 분포 (0은 상태 코드 없음)
     status_distribution = db.session.query(
-        ApiLog.status_code,
-        func.count(ApiLog.id)
+        ApiUsageHourly.status_code,
+        calls
     ).filter(
-        ApiLog.timestamp >= start_date
-    ).group_by(ApiLog.status_code).all()
+        in_range
+    ).group_by(ApiUsageHourly.status_code).all()
     
     return jsonify({
         'by_key': [{'key': k, 'count': c} for k, c in usage_by_key],
         'by_hour': [{'hour': int(h), 'count': c} for h, c in usage_by_hour],
-        'status_codes': [{'code': s, 'count': c} for s, c in status_distribution]
+        'status_codes': [{'code': s or None, 'count': c} for s, c in status_distribution]
     })
 
+@app.route('/api/stats/api-usage/rebuild', methods=['POST'])
+@login_required
+def rebuild_api_usage_stats():
+    """시간 단위 API 사용 집계를 원본 로그에서 다시 계산"""
+    days = request.args.get('days', 30, type=int)
+    start = datetime.utcnow() - timedelta(days=days)
+    
+    # 보관 기간이 지나 정리된 로그 구간은 다시 계산할 수 없으므로 horizon부터만 다시 계산 (그 이전 집계는 유지)
+    horizon = retention_horizon(app.config, 'api_log')
+    if horizon is not None:
+        start = max(start, horizon)
+    rebuilt = ApiUsageHourly.rebuild(start, horizon=horizon)
+    stats_cache.invalidate()
+    return jsonify({'status': 'success', 'logs': rebuilt, 'start': start.strftime('%Y-%m-%d %H:%M:%S')})
+
 # 회원 활동 기록 함수
 def log_member_activity(member_id, activity_type, amount=None, details=None):
     """회원 활동 기록"""
@@ -975,14 +1566,6 @@ def log_member_activity(member_id, activity_type, amount=None, details=None):
     db.session.add(activity)
     db.session.commit()
 
-# 일일 통계 계산 스케줄링 (배포용으로 비활성화)
-# scheduler.add_job(
-#     func=lambda: DailyStats.calculate_stats(date.today()),
-#     trigger=CronTrigger(hour=0, minute=5),  # 매일 00:05에 실행
-#     id='calculate_daily_stats',
-#     name='Calculate Daily Stats'
-# )
-
 @app.route('/api/test/tables', methods=['GET'])
 def test_tables():
     """데이터베이스 테이블 상태 확인"""
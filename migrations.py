@@ -0,0 +1,228 @@
+from datetime import datetime
+import logging
+
+from sqlalchemy import (Table, Column, Integer, String, DateTime, MetaData,
+                        inspect, literal, select, text)
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Admin, DailyStats, lift_statement_timeout, unread_notifications_reconcile_statement
+
+logger = logging.getLogger(__name__)
+
+# 적용된 마이그레이션 기록 테이블
+migration_metadata = MetaData()
+schema_migrations = Table(
+    'schema_migrations',
+    migration_metadata,
+    Column('version', Integer, primary_key=True),
+    Column('description', String(200)),
+    Column('applied_at', DateTime)
+)
+
+# 주요 조회 경로 인덱스 (models.py에 선언된 이름)
+HOT_PATH_INDEXES = [
+    'ix_member_phone',
+    'ix_member_expiry_date',
+    'ix_api_log_timestamp',
+    'ix_api_log_api_key_id_timestamp',
+    'ix_member_activity_member_id_timestamp',
+    'ix_notification_admin_id_is_read',
+    'ix_notification_admin_id_created_at',
+]
+
+# 보관 기간 정리(retention.py)용 시각 인덱스
+RETENTION_INDEXES = [
+    'ix_login_log_timestamp',
+    'ix_member_activity_timestamp',
+    'ix_notification_created_at',
+]
+
+# 인덱스 사용 확인용 주요 조회 (이름, SQL, 파라미터, 기대 인덱스)
+HOT_QUERIES = [
+    ('login_by_phone',
+     'SELECT * FROM member WHERE phone = :phone',
+     {'phone': '01000000000'},
+     'ix_member_phone'),
+    ('expiry_sweep',
+     'SELECT id, name, expiry_date FROM member WHERE expiry_date > :start AND expiry_date <= :end',
+     {'start': datetime(2024, 1, 1), 'end': datetime(2024, 1, 8)},
+     'ix_member_expiry_date'),
+    ('api_calls_since',
+     'SELECT count(*) FROM api_log WHERE timestamp >= :start',
+     {'start': datetime(2024, 1, 1)},
+     'ix_api_log_timestamp'),
+    ('api_key_calls_since',
+     'SELECT count(*) FROM api_log WHERE api_key_id = :api_key_id AND timestamp >= :start',
+     {'api_key_id': 1, 'start': datetime(2024, 1, 1)},
+     'ix_api_log_api_key_id_timestamp'),
+    ('member_activity',
+     'SELECT * FROM member_activity WHERE member_id = :member_id ORDER BY timestamp DESC',
+     {'member_id': 1},
+     'ix_member_activity_member_id_timestamp'),
+    ('unread_notifications',
+     'SELECT count(*) FROM notification WHERE admin_id = :admin_id AND is_read = :is_read',
+     {'admin_id': 1, 'is_read': False},
+     'ix_notification_admin_id_is_read'),
+    ('notification_page',
+     'SELECT * FROM notification WHERE admin_id = :admin_id AND (created_at < :created_at OR '
+     '(created_at = :created_at AND id < :id)) ORDER BY created_at DESC, id DESC LIMIT 21',
+     {'admin_id': 1, 'created_at': datetime(2024, 1, 1), 'id': 1},
+     'ix_notification_admin_id_created_at'),
+    ('retention_login_log',
+     'SELECT * FROM login_log WHERE timestamp < :cutoff ORDER BY timestamp, id LIMIT 1000',
+     {'cutoff': datetime(2024, 1, 1)},
+     'ix_login_log_timestamp'),
+    ('retention_member_activity',
+     'SELECT * FROM member_activity WHERE timestamp < :cutoff ORDER BY timestamp, id LIMIT 1000',
+     {'cutoff': datetime(2024, 1, 1)},
+     'ix_member_activity_timestamp'),
+    ('retention_notification',
+     'SELECT * FROM notification WHERE created_at < :cutoff AND is_read = :is_read ORDER BY created_at, id LIMIT 1000',
+     {'cutoff': datetime(2024, 1, 1), 'is_read': True},
+     'ix_notification_created_at'),
+]
+
+
+def _add_column(conn, table_name, name, type_, default=None):
+    """컬럼이 없으면 추가 (SQLite/PostgreSQL 공통 ALTER TABLE)"""
+    columns = [column['name'] for column in inspect(conn).get_columns(table_name)]
+    if name in columns:
+        return
+    ddl = f'ALTER TABLE {table_name} ADD COLUMN {name} {type_.compile(dialect=conn.dialect)}'
+    if default is not None:
+        value = literal(default, type_).compile(dialect=conn.dialect, compile_kwargs={'literal_binds': True})
+        ddl += f' DEFAULT {value}'
+    conn.execute(text(ddl))
+
+
+def _create_indexes(conn, names):
+    indexes = {index.name: index for table in db.metadata.tables.values() for index in table.indexes}
+    for name in names:
+        indexes[name].create(conn, checkfirst=True)
+
+
+def _cid_last_verified_at(conn):
+    # 기존 update_db.py에서 추가하던 컬럼
+    _add_column(conn, 'cid', 'last_verified_at', DateTime())
+
+
+def _daily_stats_finalization(conn):
+    table = DailyStats.__table__
+    _add_column(conn, 'daily_stats', 'is_final', table.c.is_final.type, default=False)
+    _add_column(conn, 'daily_stats', 'updated_at', table.c.updated_at.type)
+
+
+def _hot_path_indexes(conn):
+    _create_indexes(conn, HOT_PATH_INDEXES)
+
+
+def _backup_metadata(conn):
+    _add_column(conn, 'backup', 'duration_ms', Integer())
+    _add_column(conn, 'backup', 'page_count', Integer())
+    _add_column(conn, 'backup', 'checksum', String(64))
+
+
+def _backup_stored_size(conn):
+    _add_column(conn, 'backup', 'stored_size', Integer())
+
+
+def _retention_indexes(conn):
+    _create_indexes(conn, RETENTION_INDEXES)
+
+
+def _api_key_rate_limit(conn):
+    _add_column(conn, 'api_key', 'rate_limit', String(100))
+
+
+def _admin_unread_notifications(conn):
+    _add_column(conn, 'admin', 'unread_notifications', Admin.__table__.c.unread_notifications.type, default=0)
+    conn.execute(unread_notifications_reconcile_statement())
+
+
+def _notification_page_index(conn):
+    _create_indexes(conn, ['ix_notification_admin_id_created_at'])
+
+
+def _member_password(conn):
+    _add_column(conn, 'member', 'password_hash', String(200))
+
+
+# (버전, 설명, 함수) - 버전 순서대로 한 번씩 적용, 각 함수는 재실행해도 안전해야 함
+MIGRATIONS = [
+    (1, 'cid.last_verified_at column', _cid_last_verified_at),
+    (2, 'daily_stats is_final/updated_at columns', _daily_stats_finalization),
+    (3, 'hot-path indexes', _hot_path_indexes),
+    (4, 'backup duration/page_count/checksum columns', _backup_metadata),
+    (5, 'backup stored_size column', _backup_stored_size),
+    (6, 'retention timestamp indexes', _retention_indexes),
+    (7, 'api_key.rate_limit column', _api_key_rate_limit),
+    (8, 'admin.unread_notifications counter', _admin_unread_notifications),
+    (9, 'notification (admin_id, created_at) index', _notification_page_index),
+    (10, 'member.password_hash column', _member_password),
+]
+
+
+def applied_versions(engine):
+    with engine.connect() as conn:
+        if not inspect(conn).has_table('schema_migrations'):
+            return set()
+        return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def run_migrations(engine):
+    """미적용 마이그레이션 적용 - 적용한 버전 목록 반환
+
+    전체를 한 트랜잭션으로 실행한다. PostgreSQL은 advisory lock으로 워커 간 직렬화하고,
+    SQLite에서 동시에 시작한 다른 워커가 먼저 기록했으면 그 결과를 그대로 사용한다.
+    """
+    applied = []
+    try:
+        with engine.begin() as conn:
+            if conn.dialect.name == 'postgresql':
+                # 큰 테이블의 CREATE INDEX가 요청용 statement_timeout에 걸리지 않도록
+                lift_statement_timeout(conn)
+                conn.execute(text('SELECT pg_advisory_xact_lock(4120001)'))
+            schema_migrations.create(conn, checkfirst=True)
+            done = set(conn.execute(select(schema_migrations.c.version)).scalars())
+            for version, description, migrate in MIGRATIONS:
+                if version in done:
+                    continue
+                migrate(conn)
+                conn.execute(schema_migrations.insert().values(
+                    version=version,
+                    description=description,
+                    applied_at=datetime.utcnow()
+                ))
+                applied.append(version)
+                logger.info(f"Applied migration {version}: {description}")
+    except IntegrityError:
+        logger.info("Migrations were applied concurrently by another worker")
+        return []
+    return applied
+
+
+def explain(conn, sql, params):
+    """실행 계획 텍스트"""
+    if conn.dialect.name == 'postgresql':
+        # 작은 테이블에서는 순차 스캔을 고르므로 인덱스 사용 가능 여부만 확인
+        conn.execute(text('SET LOCAL enable_seqscan = off'))
+        rows = conn.execute(text(f'EXPLAIN {sql}'), params).all()
+        return '\n'.join(row[0] for row in rows)
+    rows = conn.execute(text(f'EXPLAIN QUERY PLAN {sql}'), params).all()
+    return '\n'.join(str(row[-1]) for row in rows)
+
+
+def check_index_usage(engine):
+    """주요 조회가 기대한 인덱스를 쓰는지 확인 - [{query, index, used, plan}]"""
+    results = []
+    with engine.connect() as conn:
+        for name, sql, params, index in HOT_QUERIES:
+            with conn.begin():
+                plan = explain(conn, sql, params)
+            results.append({
+                'query': name,
+                'index': index,
+                'used': index in plan,
+                'plan': plan
+            })
+    return results
@@ -1,13 +1,32 @@
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime, timedelta
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 import secrets
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, case, text
 import json
+from blinker import Namespace
 
 db = SQLAlchemy()
 
+
+def lift_statement_timeout(bind=None):
+    """현재 트랜잭션에서만 PostgreSQL statement_timeout 해제 (bind: Connection 또는 Session, 기본 db.session)
+
+    연결 옵션의 statement_timeout은 요청 처리용이므로 마이그레이션, 백업 덤프, 보관 기간 정리,
+    집계 재계산처럼 큰 테이블을 훑는 작업은 트랜잭션을 시작하자마자 이것을 호출한다 (커밋하면 원래 값으로 돌아감).
+    """
+    bind = bind if bind is not None else db.session
+    dialect = bind.dialect if hasattr(bind, 'dialect') else bind.get_bind().dialect
+    if dialect.name == 'postgresql':
+        bind.execute(text('SET LOCAL statement_timeout = 0'))
+
+
+# 관리자별 알림 변경 (생성/읽음/삭제 커밋 후 admin_id와 함께 발송 - 새 알림은 notifications 인자로)
+notification_signals = Namespace()
+notifications_changed = notification_signals.signal('notifications-changed')
+
 class Admin(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -17,6 +36,8 @@ class Admin(UserMixin, db.Model):
     last_attempt = db.Column(db.DateTime)
     is_locked = db.Column(db.Boolean, default=False)
     email = db.Column(db.String(120), unique=True)
+    # 읽지 않은 알림 수 (알림 생성/읽음/삭제와 같은 트랜잭션에서 증감, 주기적으로 실제 개수와 맞춤)
+    unread_notifications = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -35,7 +56,7 @@ class Admin(UserMixin, db.Model):
 class LoginLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     success = db.Column(db.Boolean, default=False)
     ip_address = db.Column(db.String(45))
     user_agent = db.Column(db.String(200))
@@ -47,6 +68,7 @@ class ApiKey(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_used_at = db.Column(db.DateTime)
     is_active = db.Column(db.Boolean, default=True)
+    rate_limit = db.Column(db.String(100))  # 키별 호출 한도 (예: '1000 per hour;20000 per day'), 없으면 기본값
     
     @staticmethod
     def generate_key():
@@ -59,10 +81,15 @@ class ApiKey(db.Model):
             'name': self.name,
             'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
             'last_used_at': self.last_used_at.strftime('%Y-%m-%d %H:%M:%S') if self.last_used_at else None,
-            'is_active': self.is_active
+            'is_active': self.is_active,
+            'rate_limit': self.rate_limit
         }
 
 class ApiLog(db.Model):
+    __table_args__ = (
+        db.Index('ix_api_log_api_key_id_timestamp', 'api_key_id', 'timestamp'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     api_key_id = db.Column(db.Integer, db.ForeignKey('api_key.id'))
     endpoint = db.Column(db.String(200), nullable=False)
@@ -72,34 +99,161 @@ class ApiLog(db.Model):
     status_code = db.Column(db.Integer)
     ip_address = db.Column(db.String(45))
     user_agent = db.Column(db.String(200))
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
     api_key = db.relationship('ApiKey', backref=db.backref('logs', lazy=True))
     
-    def to_dict(self):
-        return {
+    def to_dict(self, include_payload=True):
+        data = {
             'id': self.id,
             'api_key': self.api_key.name if self.api_key else None,
             'endpoint': self.endpoint,
             'method': self.method,
-            'request_data': self.request_data,
-            'response_data': self.response_data,
             'status_code': self.status_code,
             'ip_address': self.ip_address,
             'user_agent': self.user_agent,
             'timestamp': self.timestamp.strftime('%Y-%m-%d %H:%M:%S')
         }
+        if include_payload:
+            data['request_data'] = self.request_data
+            data['response_data'] = self.response_data
+        return data
+
+class ApiUsageHourly(db.Model):
+    """ApiLog 시간 단위 집계 (시간, API 키, 엔드포인트, 상태 코드별 호출 수)
+    
+    ApiLogWriter가 로그를 기록할 때 같은 트랜잭션에서 증가시키고,
+    rebuild()로 원본 로그에서 다시 계산할 수 있다. 키/상태 코드가 없으면 0으로 저장.
+    """
+    __table_args__ = (
+        db.UniqueConstraint('hour', 'api_key_id', 'endpoint', 'status_code', name='uq_api_usage_hourly'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    hour = db.Column(db.DateTime, nullable=False)  # 정시로 절삭한 시각
+    api_key_id = db.Column(db.Integer, nullable=False, default=0)
+    endpoint = db.Column(db.String(200), nullable=False)
+    status_code = db.Column(db.Integer, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    @staticmethod
+    def truncate_hour(value):
+        return value.replace(minute=0, second=0, microsecond=0)
+    
+    @classmethod
+    def aggregate(cls, logs):
+        """로그 행(dict) 목록 -> 집계 행 목록"""
+        counts = {}
+        for log in logs:
+            bucket = (
+                cls.truncate_hour(log['timestamp']),
+                log.get('api_key_id') or 0,
+                log['endpoint'],
+                log.get('status_code') or 0
+            )
+            counts[bucket] = counts.get(bucket, 0) + 1
+        return [
+            {'hour': hour, 'api_key_id': api_key_id, 'endpoint': endpoint,
+             'status_code': status_code, 'count': count}
+            for (hour, api_key_id, endpoint, status_code), count in counts.items()
+        ]
+    
+    @classmethod
+    def record(cls, logs):
+        """로그 배치를 집계에 더함 (커밋은 호출 측에서)"""
+        rows = cls.aggregate(logs)
+        if not rows:
+            return
+        table = cls.__table__
+        insert = _dialect_insert(table)
+        if insert is not None:
+            stmt = insert.on_conflict_do_update(
+                index_elements=[table.c.hour, table.c.api_key_id, table.c.endpoint, table.c.status_code],
+                set_={'count': table.c.count + insert.excluded['count']}
+            )
+            db.session.execute(stmt, rows)
+            return
+        
+        from sqlalchemy.exc import IntegrityError
+        for row in rows:
+            increment = table.update().where(
+                table.c.hour == row['hour'],
+                table.c.api_key_id == row['api_key_id'],
+                table.c.endpoint == row['endpoint'],
+                table.c.status_code == row['status_code']
+            ).values(count=table.c.count + row['count'])
+            if db.session.execute(increment).rowcount:
+                continue
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(table.insert().values(**row))
+            except IntegrityError:
+                db.session.execute(increment)
+    
+    @classmethod
+    def rebuild(cls, start, end=None, horizon=None):
+        """[start, end) 구간 집계를 원본 ApiLog에서 다시 계산 (압축/복구용)
+
+        horizon(보관 기간 정리로 원본 로그가 없어진 경계) 이전 시간대는 다시 계산할 원본이 없으므로
+        집계를 지우지 않고 그대로 둔다.
+        """
+        start = cls.truncate_hour(start)
+        if horizon is not None:
+            start = max(start, cls.truncate_hour(horizon))
+        end = cls.truncate_hour(end or datetime.utcnow()) + timedelta(hours=1)
+        if start >= end:
+            return 0
+        
+        lift_statement_timeout()
+        cls.query.filter(cls.hour >= start, cls.hour < end).delete(synchronize_session=False)
+        
+        logs = db.session.query(
+            ApiLog.timestamp,
+            ApiLog.api_key_id,
+            ApiLog.endpoint,
+            ApiLog.status_code
+        ).filter(
+            ApiLog.timestamp >= start,
+            ApiLog.timestamp < end
+        ).yield_per(5000)
+        
+        batch = []
+        rebuilt = 0
+        for timestamp, api_key_id, endpoint, status_code in logs:
+            batch.append({'timestamp': timestamp, 'api_key_id': api_key_id,
+                          'endpoint': endpoint, 'status_code': status_code})
+            if len(batch) >= 5000:
+                cls.record(batch)
+                rebuilt += len(batch)
+                batch = []
+        cls.record(batch)
+        rebuilt += len(batch)
+        db.session.commit()
+        return rebuilt
+    
+    @classmethod
+    def since(cls, start):
+        """start가 속한 시간부터의 집계 조건"""
+        return cls.hour >= cls.truncate_hour(start)
 
 class Member(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    phone = db.Column(db.String(20), nullable=False)
+    phone = db.Column(db.String(20), nullable=False, index=True)
     registration_date = db.Column(db.DateTime, nullable=False)
-    expiry_date = db.Column(db.DateTime, nullable=False)
+    expiry_date = db.Column(db.DateTime, nullable=False, index=True)
     deposit_amount = db.Column(db.Integer, default=0)
     referrer = db.Column(db.String(100))
+    # 클라이언트 로그인(/api/login) 비밀번호 - 설정한 회원만 확인 (MEMBER_PASSWORD_REQUIRED면 필수)
+    password_hash = db.Column(db.String(200))
     cids = db.relationship('CID', backref='member', lazy=True, cascade='all, delete-orphan')
     
+    def set_password(self, password):
+        self.password_hash = generate_password_hash(password)
+    
+    def check_password(self, password):
+        return bool(self.password_hash) and check_password_hash(self.password_hash, password)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -109,6 +263,7 @@ class Member(db.Model):
             'expiry_date': self.expiry_date.strftime('%Y-%m-%d'),
             'deposit_amount': self.deposit_amount,
             'referrer': self.referrer,
+            'has_password': bool(self.password_hash),
             'cids': [cid.cid_value for cid in self.cids]
         }
 
@@ -133,8 +288,12 @@ class Backup(db.Model):
     filename = db.Column(db.String(200), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     size = db.Column(db.Integer)  # 파일 크기 (bytes)
+    stored_size = db.Column(db.Integer)  # 저장소에 새로 기록한 압축 청크 크기 (bytes)
     description = db.Column(db.String(500))
     is_auto = db.Column(db.Boolean, default=False)  # 자동 백업 여부
+    duration_ms = db.Column(db.Integer)  # 백업 소요 시간
+    page_count = db.Column(db.Integer)  # SQLite 페이지 수 (논리 덤프는 없음)
+    checksum = db.Column(db.String(64))  # 백업 파일 SHA-256
     
     def to_dict(self):
         return {
@@ -142,8 +301,12 @@ class Backup(db.Model):
             'filename': self.filename,
             'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
             'size': self.size,
+            'stored_size': self.stored_size,
             'description': self.description,
-            'is_auto': self.is_auto
+            'is_auto': self.is_auto,
+            'duration_ms': self.duration_ms,
+            'page_count': self.page_count,
+            'checksum': self.checksum
         }
 
 class BackupSchedule(db.Model):
@@ -176,43 +339,119 @@ class DailyStats(db.Model):
     new_members = db.Column(db.Integer, default=0)
     expired_members = db.Column(db.Integer, default=0)
     total_deposit = db.Column(db.Integer, default=0)
+    is_final = db.Column(db.Boolean, default=False)  # 지난 날짜 확정 여부 (확정 후 재계산 안 함)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     @classmethod
     def calculate_stats(cls, date):
         """일일 통계 계산"""
-        stats = cls.query.filter_by(date=date).first() or cls(date=date)
+        cls.backfill(date, date, recompute=True)
+        return cls.query.filter_by(date=date).first()
+    
+    @classmethod
+    def backfill(cls, start_date, end_date, recompute=False):
+        """누락되었거나 확정되지 않은 날짜의 통계만 계산
+        
+        날짜별 값은 지표마다 범위 GROUP BY 쿼리 1회로 구하므로
+        쿼리 수가 기간 길이와 무관하다. 오늘 이전 날짜는 확정(is_final)되어
+        이후 다시 계산하지 않는다.
+        """
+        today = datetime.now().date()
+        days = [start_date + timedelta(days=n) for n in range((end_date - start_date).days + 1)]
+        lift_statement_timeout()
+        if not recompute:
+            final_days = {
+                row.date for row in db.session.query(cls.date).filter(
+                    cls.date.between(start_date, end_date),
+                    cls.is_final == True
+                )
+            }
+            days = [day for day in days if day not in final_days]
+        if not days:
+            return 0
+        
+        first_day, last_day = days[0], days[-1]
+        range_start = datetime.combine(first_day, datetime.min.time())
+        range_end = datetime.combine(last_day + timedelta(days=1), datetime.min.time())
         
-        # 전체 회원 수 및 활성 회원 수
-        stats.total_members = Member.query.count()
-        stats.active_members = Member.query.filter(Member.expiry_date >= date).count()
+        def count_by_day(column):
+            rows = db.session.query(
+                func.date(column),
+                func.count()
+            ).filter(
+                column >= range_start,
+                column < range_end
+            ).group_by(func.date(column)).all()
+            return {_as_date(day): count for day, count in rows}
         
-        # 전체 CID 수 및 활성 CID 수
-        stats.total_cids = CID.query.count()
-        stats.active_cids = CID.query.filter_by(is_active=True).count()
+        api_calls = count_by_day(ApiLog.timestamp)
+        new_members = count_by_day(Member.registration_date)
+        expired_members = count_by_day(Member.expiry_date)
         
-        # API 호출 수
-        stats.api_calls = ApiLog.query.filter(
-            func.date(ApiLog.timestamp) == date
-        ).count()
+        # 누적 값의 시작점 (범위 이전)
+        member_count = Member.query.count()
+        registered = Member.query.filter(Member.registration_date < range_start).count()
+        expired_before = Member.query.filter(Member.expiry_date < range_start).count()
         
-        # 신규 회원 수
-        stats.new_members = Member.query.filter(
-            func.date(Member.registration_date) == date
-        ).count()
+        # CID/입금액은 이력이 없으므로 계산 시점 값
+        total_cids = CID.query.count()
+        active_cids = CID.query.filter_by(is_active=True).count()
+        total_deposit = db.session.query(func.sum(Member.deposit_amount)).scalar() or 0
         
-        # 만료된 회원 수
-        stats.expired_members = Member.query.filter(
-            func.date(Member.expiry_date) == date
-        ).count()
+        pending = set(days)
+        now = datetime.utcnow()
+        rows = []
+        day = first_day
+        while day <= last_day:
+            registered += new_members.get(day, 0)
+            if day in pending:
+                rows.append({
+                    'date': day,
+                    'total_members': registered,
+                    'active_members': member_count - expired_before,
+                    'total_cids': total_cids,
+                    'active_cids': active_cids,
+                    'api_calls': api_calls.get(day, 0),
+                    'new_members': new_members.get(day, 0),
+                    'expired_members': expired_members.get(day, 0),
+                    'total_deposit': total_deposit,
+                    'is_final': day < today,
+                    'updated_at': now
+                })
+            expired_before += expired_members.get(day, 0)
+            day += timedelta(days=1)
         
-        # 총 입금액
-        stats.total_deposit = db.session.query(
-            func.sum(Member.deposit_amount)
-        ).scalar() or 0
+        cls.upsert_many(rows, overwrite_final=recompute)
+        return len(rows)
+    
+    @classmethod
+    def upsert_many(cls, rows, overwrite_final=False):
+        """date 기준 upsert - 여러 워커가 동시에 같은 날짜를 써도 안전"""
+        if not rows:
+            return
+        table = cls.__table__
+        update_columns = [column for column in rows[0] if column != 'date']
         
-        db.session.add(stats)
+        stmt = _dialect_insert(table)
+        if stmt is not None:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.date],
+                set_={column: stmt.excluded[column] for column in update_columns},
+                where=None if overwrite_final else table.c.is_final == False
+            )
+            db.session.execute(stmt, rows)
+        else:
+            from sqlalchemy.exc import IntegrityError
+            for row in rows:
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(table.insert().values(**row))
+                except IntegrityError:
+                    update = table.update().where(table.c.date == row['date'])
+                    if not overwrite_final:
+                        update = update.where(table.c.is_final == False)
+                    db.session.execute(update.values({column: row[column] for column in update_columns}))
         db.session.commit()
-        return stats
     
     def to_dict(self):
         return {
@@ -227,12 +466,33 @@ class DailyStats(db.Model):
             'total_deposit': self.total_deposit
         }
 
+def _dialect_insert(table):
+    """ON CONFLICT를 지원하는 INSERT (SQLite/PostgreSQL, 그 외에는 None)"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    return insert(table)
+
+def _as_date(value):
+    """func.date() 결과 -> date (SQLite는 문자열로 반환)"""
+    if isinstance(value, str):
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    return value
+
 class MemberActivity(db.Model):
+    __table_args__ = (
+        db.Index('ix_member_activity_member_id_timestamp', 'member_id', 'timestamp'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     member_id = db.Column(db.Integer, db.ForeignKey('member.id'), nullable=False)
     activity_type = db.Column(db.String(50), nullable=False)  # registration, renewal, deposit
     amount = db.Column(db.Integer)  # 입금액
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     details = db.Column(db.Text)
     
     member = db.relationship('Member', backref=db.backref('activities', lazy=True))
@@ -273,41 +533,45 @@ Member.get_stats = classmethod(get_member_stats)
 # CID 모델에 통계 메서드 추가
 def get_cid_stats(cls):
     """CID 통계 조회"""
+    total, members_with_cid = db.session.query(
+        func.count(cls.id),
+        func.count(func.distinct(cls.member_id))
+    ).one()
+    
     return {
-        'total': cls.query.count(),
+        'total': total,
         'active': cls.query.filter_by(is_active=True).count(),
-        'per_member_avg': db.session.query(
-            func.avg(
-                db.session.query(func.count(cls.id))
-                .filter(cls.member_id == Member.id)
-                .group_by(cls.member_id)
-                .scalar_subquery()
-            )
-        ).scalar() or 0
+        # CID를 가진 회원당 평균 CID 수 (회원별 상관 서브쿼리 대신 한 번에 집계)
+        'per_member_avg': total / members_with_cid if members_with_cid else 0
     }
 
 CID.get_stats = classmethod(get_cid_stats)
 
 # ApiLog 모델에 통계 메서드 추가
 def get_api_stats(cls, days=30):
-    """API 사용 통계 조회"""
+    """API 사용 통계 조회 (시간 단위 집계 테이블 기준)"""
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days)
+    in_range = ApiUsageHourly.since(start_date)
+    calls = func.sum(ApiUsageHourly.count)
+    
+    total_calls, success_calls = db.session.query(
+        calls,
+        func.sum(case((ApiUsageHourly.status_code.between(200, 299), ApiUsageHourly.count), else_=0))
+    ).filter(in_range).one()
     
     return {
-        'total_calls': cls.query.filter(cls.timestamp >= start_date).count(),
-        'success_rate': db.session.query(
-            func.avg(cls.status_code.between(200, 299))
-        ).filter(cls.timestamp >= start_date).scalar() or 0,
+        'total_calls': total_calls or 0,
+        'success_rate': (success_calls or 0) / total_calls if total_calls else 0,
         'calls_by_endpoint': db.session.query(
-            cls.endpoint,
-            func.count(cls.id)
-        ).filter(cls.timestamp >= start_date).group_by(cls.endpoint).all(),
+            ApiUsageHourly.endpoint,
+            calls
+        ).filter(in_range).group_by(ApiUsageHourly.endpoint).all(),
         'calls_by_date': db.session.query(
-            func.date(cls.timestamp),
-            func.count(cls.id)
-        ).filter(cls.timestamp >= start_date).group_by(
-            func.date(cls.timestamp)
+            func.date(ApiUsageHourly.hour),
+            calls
+        ).filter(in_range).group_by(
+            func.date(ApiUsageHourly.hour)
         ).all()
     }
 
@@ -334,6 +598,11 @@ class NotificationSetting(db.Model):
         }
 
 class Notification(db.Model):
+    __table_args__ = (
+        db.Index('ix_notification_admin_id_is_read', 'admin_id', 'is_read'),
+        db.Index('ix_notification_admin_id_created_at', 'admin_id', 'created_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     admin_id = db.Column(db.Integer, db.ForeignKey('admin.id'), nullable=False)
     type = db.Column(db.String(50), nullable=False)
@@ -342,7 +611,7 @@ class Notification(db.Model):
     priority = db.Column(db.String(20), default='normal')
     data = db.Column(db.Text)  # JSON 형식의 추가 데이터
     is_read = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
     admin = db.relationship('Admin', backref=db.backref('notifications', lazy=True))
     
@@ -385,7 +654,9 @@ def create_notification(cls, admin_id, type, title, message, priority='normal',
         data=json.dumps(data) if data else None
     )
     db.session.add(notification)
+    adjust_unread_notifications(admin_id, 1)
     db.session.commit()
+    notifications_changed.send(cls, admin_id=admin_id, notifications=[notification])
     
     # 이메일 알림 전송 (설정된 경우)
     if setting.email_enabled:
@@ -401,60 +672,134 @@ def create_notification(cls, admin_id, type, title, message, priority='normal',
 
 Notification.create = classmethod(create_notification)
 
+def create_notifications(cls, admin_id, type, items, priority='normal'):
+    """같은 유형의 알림 여러 건을 한 번에 생성 (커밋 1회)
+
+    items: title, message, priority(선택), data(선택) 키를 가진 dict 목록
+    """
+    if not items:
+        return []
+    
+    setting = NotificationSetting.query.filter_by(
+        admin_id=admin_id,
+        type=type
+    ).first()
+    
+    if not setting:
+        setting = NotificationSetting(
+            admin_id=admin_id,
+            type=type,
+            priority=priority
+        )
+        db.session.add(setting)
+    
+    notifications = [
+        cls(
+            admin_id=admin_id,
+            type=type,
+            title=item['title'],
+            message=item['message'],
+            priority=item.get('priority', priority),
+            data=json.dumps(item['data']) if item.get('data') else None
+        )
+        for item in items
+    ]
+    db.session.add_all(notifications)
+    adjust_unread_notifications(admin_id, len(notifications))
+    db.session.commit()
+    notifications_changed.send(cls, admin_id=admin_id, notifications=notifications)
+    
+    if setting.email_enabled:
+        admin = Admin.query.get(admin_id)
+        if admin and admin.email:
+            for notification in notifications:
+                send_email_notification(
+                    admin.email,
+                    notification.title,
+                    notification.message
+                )
+    
+    return notifications
+
+Notification.create_many = classmethod(create_notifications)
+
+def notification_recipients():
+    """시스템 알림(만료 예정, API 사용량)을 받을 관리자 id 목록
+
+    NOTIFICATION_ADMIN_IDS('1,3')가 있으면 그 관리자만, 없으면 모든 관리자.
+    """
+    spec = current_app.config.get('NOTIFICATION_ADMIN_IDS', '')
+    if spec.strip():
+        return [int(admin_id) for admin_id in spec.split(',') if admin_id.strip()]
+    return [admin_id for admin_id, in db.session.query(Admin.id).order_by(Admin.id)]
+
+def adjust_unread_notifications(admin_id, delta):
+    """관리자의 읽지 않은 알림 수 증감 (커밋은 호출 측에서 - 알림 변경과 같은 트랜잭션)"""
+    if not delta:
+        return
+    table = Admin.__table__
+    db.session.execute(
+        table.update()
+        .where(table.c.id == admin_id)
+        .values(unread_notifications=table.c.unread_notifications + delta)
+    )
+
+def reconcile_unread_notifications():
+    """읽지 않은 알림 수를 실제 개수로 맞춤 - 다르던 관리자 수 반환 (UPDATE 1회)"""
+    result = db.session.execute(unread_notifications_reconcile_statement())
+    db.session.commit()
+    return result.rowcount
+
+def unread_notifications_reconcile_statement():
+    admin = Admin.__table__
+    notification = Notification.__table__
+    actual = db.select(func.count(notification.c.id)).where(
+        notification.c.admin_id == admin.c.id,
+        notification.c.is_read == False
+    ).scalar_subquery()
+    return admin.update().where(admin.c.unread_notifications != actual).values(unread_notifications=actual)
+
+class ExpiryNotice(db.Model):
+    """회원별 만료 예정 알림 발송 기록 (만료일 + 구간당 1회)"""
+    __table_args__ = (
+        db.UniqueConstraint('member_id', 'window_days', 'expiry_date', name='uq_expiry_notice'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    member_id = db.Column(db.Integer, db.ForeignKey('member.id', ondelete='CASCADE'), nullable=False)
+    window_days = db.Column(db.Integer, nullable=False)  # 7, 3
+    expiry_date = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class SchedulerJob(db.Model):
+    """스케줄러 작업별 마지막 실행 기록 (리더 워커가 바뀌어도 이어서 판단)"""
+    name = db.Column(db.String(100), primary_key=True)
+    last_run = db.Column(db.DateTime)  # 로컬 시각
+    last_status = db.Column(db.String(20))  # success, failed
+    last_error = db.Column(db.String(500))
+    duration_ms = db.Column(db.Integer)
+    
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'last_run': self.last_run.strftime('%Y-%m-%d %H:%M:%S') if self.last_run else None,
+            'last_status': self.last_status,
+            'last_error': self.last_error,
+            'duration_ms': self.duration_ms
+        }
+
+class RevokedToken(db.Model):
+    """세션 토큰 거부 목록 (토큰 1개 또는 회원/CID 단위, 토큰 유효 기간이 지나면 삭제 가능)
+
+    kind='jti': value의 토큰 하나, kind='member'/'cid': revoked_at 이전에 발급된 해당 회원/CID의 모든 토큰.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(10), nullable=False)  # jti, member, cid
+    value = db.Column(db.String(100), nullable=False)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
 def send_email_notification(email, title, message):
     """이메일 알림 전송 (실제 구현 필요)"""
     # TODO: 이메일 전송 구현
     pass
-
-# 알림 생성이 필요한 모델들에 이벤트 리스너 추가
-from sqlalchemy import event
-
-@event.listens_for(Member.expiry_date, 'set')
-def check_member_expiry(target, value, oldvalue, initiator):
-    """회원 만료일 변경 시 만료 예정 알림"""
-    if value and isinstance(value, datetime):
-        days_until_expiry = (value - datetime.now()).days
-        if days_until_expiry <= 7:
-            Notification.create(
-                admin_id=1,  # TODO: 실제 관리자 ID 사용
-                type='expiry',
-                title='회원 만료 예정',
-                message=f'회원 {target.name}의 이용 기간이 {days_until_expiry}일 후 만료됩니다.',
-                priority='high' if days_until_expiry <= 3 else 'normal',
-                data={'member_id': target.id}
-            )
-
-@event.listens_for(ApiLog, 'after_insert')
-def check_api_usage(mapper, connection, target):
-    """API 사용량 모니터링"""
-    # 시간당 호출 수 체크
-    hour_ago = datetime.utcnow() - timedelta(hours=1)
-    calls_last_hour = ApiLog.query.filter(
-        ApiLog.api_key_id == target.api_key_id,
-        ApiLog.timestamp >= hour_ago
-    ).count()
-    
-    if calls_last_hour > 1000:  # 임계값
-        Notification.create(
-            admin_id=1,  # TODO: 실제 관리자 ID 사용
-            type='api_usage',
-            title='API 사용량 경고',
-            message=f'API 키의 시간당 사용량이 임계값을 초과했습니다. (최근 1시간: {calls_last_hour}회)',
-            priority='high',
-            data={'api_key_id': target.api_key_id}
-        )
-    
-    # 오류 응답 모니터링
-    if target.status_code >= 400:
-        Notification.create(
-            admin_id=1,  # TODO: 실제 관리자 ID 사용
-            type='error',
-            title='API 오류 발생',
-            message=f'API 호출 중 오류가 발생했습니다. (상태 코드: {target.status_code})',
-            priority='high' if target.status_code >= 500 else 'normal',
-            data={
-                'api_key_id': target.api_key_id,
-                'endpoint': target.endpoint,
-                'status_code': target.status_code
-            }
-        ) 
\ No newline at end of file
@@ -0,0 +1,223 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from models import db, Admin, Notification, notifications_changed
+
+logger = logging.getLogger(__name__)
+
+
+def format_event(event, data, event_id=None):
+    """SSE 메시지 한 건"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, ensure_ascii=False)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+class NotificationBroker:
+    """관리자별 알림 변경을 열려 있는 SSE 연결로 전달
+
+    알림을 바꾼 워커는 notifications_changed 신호를 받아 state_dir/<admin_id>.rev 파일에 1바이트를 덧붙인다.
+    구독자가 있는 워커의 감시 스레드는 poll_interval마다 이 파일의 크기/mtime만 확인하고 (DB 접근 없음),
+    바뀐 경우에만 관리자당 한 번 개수와 새 알림을 읽어 그 워커의 모든 연결에 보낸다.
+    같은 워커의 변경은 기다리지 않고 바로 전달된다.
+    열린 연결은 gthread 워커의 스레드를 하나씩 차지하므로 워커당 max_streams개까지만 받는다.
+    """
+
+    # .rev 파일이 이 크기를 넘으면 비움 (크기 변화도 변경으로 감지됨)
+    MAX_REV_SIZE = 4096
+
+    def __init__(self, app=None, state_dir='notification_state', poll_interval=1.0,
+                 keepalive=20, stream_max=300, max_backlog=50, max_streams=8):
+        self.app = None
+        self.state_dir = state_dir
+        self.poll_interval = poll_interval
+        self.keepalive = keepalive
+        self.stream_max = stream_max  # 연결을 이 시간(초) 뒤 닫음 - 브라우저가 Last-Event-ID로 다시 연결
+        self.max_backlog = max_backlog
+        self.max_streams = max_streams
+        self._streams = 0  # 이 워커에서 열려 있는 스트림 응답 수
+        self._subscribers = {}  # admin_id -> [queue.Queue]
+        self._versions = {}  # admin_id -> (size, mtime_ns)
+        self._last_ids = {}  # admin_id -> 전달한 마지막 알림 id
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.state_dir = app.config.get('NOTIFICATION_STATE_DIR', self.state_dir)
+        self.poll_interval = app.config.get('NOTIFICATION_POLL_INTERVAL', self.poll_interval)
+        self.keepalive = app.config.get('NOTIFICATION_KEEPALIVE', self.keepalive)
+        self.stream_max = app.config.get('NOTIFICATION_STREAM_MAX', self.stream_max)
+        self.max_streams = app.config.get('NOTIFICATION_MAX_STREAMS', self.max_streams)
+        os.makedirs(self.state_dir, exist_ok=True)
+        notifications_changed.connect(self._on_change, weak=False)
+        app.extensions['notification_broker'] = self
+
+    def _rev_path(self, admin_id):
+        return os.path.join(self.state_dir, f'{int(admin_id)}.rev')
+
+    def _version(self, admin_id):
+        try:
+            st = os.stat(self._rev_path(admin_id))
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def _on_change(self, sender, admin_id, notifications=()):
+        self.publish(admin_id)
+
+    def publish(self, admin_id):
+        """관리자의 알림이 바뀌었음을 모든 워커에 알림 (커밋 후 호출)"""
+        path = self._rev_path(admin_id)
+        try:
+            # O_APPEND 쓰기는 원자적이라 여러 워커가 동시에 써도 변경이 사라지지 않음
+            with open(path, 'ab') as f:
+                f.write(b'.')
+                size = f.tell()
+            if size > self.MAX_REV_SIZE:
+                os.truncate(path, 0)
+        except OSError as e:
+            logger.error(f"Notification change marker write failed: {str(e)}")
+        self._wake.set()
+
+    def acquire(self):
+        """스트림 자리 확보 - 워커의 한도를 넘으면 False (응답이 닫힐 때 release)"""
+        with self._lock:
+            if self._streams >= self.max_streams:
+                return False
+            self._streams += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._streams = max(self._streams - 1, 0)
+
+    def subscribe(self, admin_id):
+        """연결 등록 - 이후 변경 이벤트를 받을 큐 반환"""
+        q = queue.Queue(maxsize=100)
+        with self._lock:
+            self._subscribers.setdefault(admin_id, []).append(q)
+            if admin_id not in self._versions:
+                self._versions[admin_id] = self._version(admin_id)
+        self._ensure_watcher()
+        return q
+
+    def unsubscribe(self, admin_id, q):
+        with self._lock:
+            queues = self._subscribers.get(admin_id, [])
+            if q in queues:
+                queues.remove(q)
+            if not queues:
+                self._subscribers.pop(admin_id, None)
+                self._versions.pop(admin_id, None)
+                self._last_ids.pop(admin_id, None)
+
+    def stream(self, admin_id, last_event_id=None):
+        """SSE 응답 본문 - 현재 개수(+ 재연결이면 놓친 알림)를 보낸 뒤 변경을 기다림
+
+        연결 시 한 번만 DB를 읽고, 이후에는 큐 대기만 한다 (DB 연결을 잡지 않음).
+        """
+        q = self.subscribe(admin_id)
+        deadline = time.monotonic() + self.stream_max
+        try:
+            with self.app.app_context():
+                try:
+                    latest = self.latest_id(admin_id)
+                    events = self.snapshot(admin_id, last_event_id)
+                finally:
+                    db.session.remove()
+            with self._lock:
+                self._last_ids.setdefault(admin_id, latest)
+
+            yield 'retry: 3000\n\n'
+            for event, _ in events:
+                yield event
+            while time.monotonic() < deadline:
+                try:
+                    yield q.get(timeout=self.keepalive)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+        finally:
+            self.unsubscribe(admin_id, q)
+
+    def _ensure_watcher(self):
+        # fork(--preload) 이후에는 스레드가 복제되지 않으므로 워커별로 시작
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='notification-broker', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            with self._lock:
+                changed = []
+                for admin_id in self._subscribers:
+                    version = self._version(admin_id)
+                    if version != self._versions.get(admin_id):
+                        self._versions[admin_id] = version
+                        changed.append(admin_id)
+            for admin_id in changed:
+                try:
+                    self._dispatch(admin_id)
+                except Exception as e:
+                    logger.error(f"Notification dispatch failed for admin {admin_id}: {str(e)}")
+
+    def _dispatch(self, admin_id):
+        with self.app.app_context():
+            try:
+                events = self.snapshot(admin_id, self._last_ids.get(admin_id))
+            finally:
+                db.session.remove()
+
+        with self._lock:
+            if events and events[-1][1] is not None:
+                self._last_ids[admin_id] = events[-1][1]
+            queues = list(self._subscribers.get(admin_id, []))
+        for q in queues:
+            for event, _ in events:
+                try:
+                    q.put_nowait(event)
+                except queue.Full:
+                    pass
+
+    def snapshot(self, admin_id, last_id=None):
+        """현재 읽지 않은 개수 + last_id 이후 새 알림 -> [(SSE 메시지, 알림 id)]"""
+        count = db.session.query(Admin.unread_notifications).filter_by(id=admin_id).scalar() or 0
+        events = [(format_event('count', {'count': count}), None)]
+        if last_id is not None:
+            notifications = Notification.query.filter(
+                Notification.admin_id == admin_id,
+                Notification.id > last_id
+            ).order_by(Notification.id).limit(self.max_backlog).all()
+            for notification in notifications:
+                events.append((format_event('notification', notification.to_dict(), notification.id), notification.id))
+        return events
+
+    def latest_id(self, admin_id):
+        return db.session.query(db.func.max(Notification.id)).filter_by(admin_id=admin_id).scalar() or 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'admins': len(self._subscribers),
+                'connections': sum(len(queues) for queues in self._subscribers.values()),
+                'streams': self._streams,
+                'max_streams': self.max_streams
+            }
@@ -0,0 +1,14 @@
+from datetime import datetime
+import base64
+import json
+
+
+def encode_cursor(values):
+    """keyset 커서 인코딩 (정렬값, id)"""
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor):
+    values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    return [datetime.fromisoformat(v) if isinstance(v, str) else v for v in values]
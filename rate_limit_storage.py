@@ -0,0 +1,102 @@
+import os
+import sqlite3
+import threading
+import time
+
+from limits.storage import Storage
+
+
+class SQLiteCounterStorage(Storage):
+    """워커 간 공유 rate limit 카운터 (같은 서버의 SQLite 파일)
+
+    Flask-Limiter storage_uri: 'sqlite-ratelimit:///ratelimit.db' (상대 경로) 또는
+    'sqlite-ratelimit:////var/lib/quicker/ratelimit.db' (절대 경로).
+    카운터는 잃어도 되는 값이므로 WAL + synchronous=OFF로 fsync 없이 기록한다 (호출당 수십 µs).
+    앱 DB와 별도 파일이라 요청 경로에 앱 DB 조회가 추가되지 않는다.
+    """
+
+    STORAGE_SCHEME = ['sqlite-ratelimit']
+
+    # 만료된 카운터 정리 주기 (incr 호출 수)
+    PURGE_EVERY = 1000
+
+    def __init__(self, uri, wrap_exceptions=False, busy_timeout=1000, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        path = uri.split('://', 1)[1]
+        self.path = path[1:] if path.startswith('/') else path
+        self.busy_timeout = int(busy_timeout)
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        # fork 이후에는 부모의 연결을 쓰지 않음
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout / 1000,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS rate_limit_counter ('
+                'key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL NOT NULL'
+                ') WITHOUT ROWID'
+            )
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def incr(self, key, expiry, elastic_expiry=False, amount=1):
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            # 만료된 카운터는 새 창으로 다시 시작 (elastic_expiry면 만료 시각 연장)
+            value = conn.execute(
+                'INSERT INTO rate_limit_counter (key, value, expires_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET '
+                'value = CASE WHEN expires_at <= ? THEN excluded.value ELSE value + excluded.value END, '
+                'expires_at = CASE WHEN expires_at <= ? OR ? THEN excluded.expires_at ELSE expires_at END '
+                'RETURNING value',
+                (key, amount, now + expiry, now, now, bool(elastic_expiry))
+            ).fetchone()[0]
+
+            self._calls += 1
+            if self._calls >= self.PURGE_EVERY:
+                self._calls = 0
+                conn.execute('DELETE FROM rate_limit_counter WHERE expires_at <= ?', (now,))
+        return value
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection().execute(
+                'SELECT value FROM rate_limit_counter WHERE key = ? AND expires_at > ?',
+                (key, time.time())
+            ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        with self._lock:
+            row = self._connection().execute(
+                'SELECT expires_at FROM rate_limit_counter WHERE key = ?', (key,)
+            ).fetchone()
+        return row[0] if row else time.time()
+
+    def check(self):
+        try:
+            with self._lock:
+                self._connection().execute('SELECT 1')
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        with self._lock:
+            return self._connection().execute('DELETE FROM rate_limit_counter').rowcount
+
+    def clear(self, key):
+        with self._lock:
+            self._connection().execute('DELETE FROM rate_limit_counter WHERE key = ?', (key,))
@@ -0,0 +1,115 @@
+from contextlib import contextmanager
+import logging
+import os
+import threading
+import time
+
+from flask import request, jsonify
+
+from models import db
+
+logger = logging.getLogger(__name__)
+
+WRITE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
+class RestoreGate:
+    """복원 중 쓰기 요청 대기 + 복원 후 모든 워커의 엔진/캐시 재설정
+
+    복원하는 워커가 state_dir에 표시 파일을 만들면 다른 워커들은 쓰기 요청을 실패시키지 않고
+    복원이 끝날 때까지(최대 hold_timeout) 잡아 둔다. 복원이 끝나면 세대 파일을 갱신하고,
+    각 워커는 다음 요청에서 세대가 바뀐 것을 보고 연결 풀과 메모리 캐시를 버린다.
+    (요청마다 stat 한 번 - DB 접근 없음)
+    """
+
+    def __init__(self, app=None, state_dir='.', hold_timeout=30, poll_interval=0.05, stale_after=600):
+        self.app = None
+        self.state_dir = state_dir
+        self.hold_timeout = hold_timeout
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after  # 복원 중 프로세스가 죽어 남은 표시 파일은 무시
+        self._callbacks = []
+        self._generation = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.hold_timeout = app.config.get('RESTORE_HOLD_TIMEOUT', self.hold_timeout)
+        self._generation = self._read_generation()
+        app.before_request(self.before_request)
+
+    @property
+    def marker_path(self):
+        return os.path.join(self.state_dir, 'restore.lock')
+
+    @property
+    def generation_path(self):
+        return os.path.join(self.state_dir, 'restore.generation')
+
+    def on_restore(self, callback):
+        """복원 후 워커별로 한 번 실행할 함수 등록 (메모리 캐시 비우기 등)"""
+        self._callbacks.append(callback)
+        return callback
+
+    def in_progress(self):
+        try:
+            started = os.path.getmtime(self.marker_path)
+        except OSError:
+            return False
+        return time.time() - started < self.stale_after
+
+    @contextmanager
+    def hold(self):
+        """with 블록 동안 모든 워커의 쓰기 요청 대기, 끝나면 세대 갱신"""
+        with open(self.marker_path, 'w') as f:
+            f.write(str(os.getpid()))
+        try:
+            yield
+        finally:
+            self._bump_generation()
+            os.remove(self.marker_path)
+            self.sync()
+
+    def before_request(self):
+        if request.method in WRITE_METHODS and self.in_progress():
+            deadline = time.monotonic() + self.hold_timeout
+            while self.in_progress():
+                if time.monotonic() >= deadline:
+                    response = jsonify({'error': 'Database restore in progress. Please retry.'})
+                    response.status_code = 503
+                    response.headers['Retry-After'] = '5'
+                    return response
+                time.sleep(self.poll_interval)
+        self.sync()
+
+    def sync(self):
+        """복원되었으면(다른 워커 포함) 연결 풀을 버리고 등록된 캐시 초기화"""
+        generation = self._read_generation()
+        if generation == self._generation:
+            return False
+        with self._lock:
+            if generation == self._generation:
+                return False
+            db.engine.dispose()
+            for callback in self._callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"Restore callback failed: {str(e)}")
+            self._generation = generation
+        logger.info(f"Database restored - engine and caches reset (pid {os.getpid()})")
+        return True
+
+    def _read_generation(self):
+        try:
+            return os.stat(self.generation_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _bump_generation(self):
+        tmp_path = f'{self.generation_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(str(time.time_ns()))
+        os.replace(tmp_path, self.generation_path)
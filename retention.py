@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""보관 기간이 지난 로그/이력 아카이브
+
+python retention.py query api_log 2024-01-01 2024-01-31          # 아카이브 조회 (JSON Lines 출력)
+python retention.py query login_log 2024-01-01 2024-01-31 --where success=false
+"""
+from datetime import datetime, date, timedelta
+import gzip
+import json
+import logging
+import os
+import time
+
+from sqlalchemy import select
+
+from db_backup import json_default
+from models import db, lift_statement_timeout
+
+logger = logging.getLogger(__name__)
+
+# (테이블, 시각 컬럼, 보관 기간 설정 키, 추가 조건) - 안 읽은 알림은 보관 기간이 지나도 남김
+RETENTION_POLICIES = [
+    ('api_log', 'timestamp', 'RETENTION_API_LOG_DAYS', None),
+    ('login_log', 'timestamp', 'RETENTION_LOGIN_LOG_DAYS', None),
+    ('member_activity', 'timestamp', 'RETENTION_MEMBER_ACTIVITY_DAYS', None),
+    ('notification', 'created_at', 'RETENTION_NOTIFICATION_DAYS', ('is_read', True)),
+]
+
+
+def archive_path(archive_dir, table_name, day):
+    return os.path.join(archive_dir, table_name, f'{day.isoformat()}.jsonl.gz')
+
+
+def _append_partitions(archive_dir, table_name, time_column, rows):
+    # 날짜별 파일에 gzip 멤버로 이어 붙임 (gzip.open으로 한 파일처럼 읽힘)
+    partitions = {}
+    for row in rows:
+        partitions.setdefault(row[time_column].date(), []).append(row)
+
+    for day, day_rows in partitions.items():
+        path = archive_path(archive_dir, table_name, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, 'at', encoding='utf-8') as out:
+            for row in day_rows:
+                out.write(json.dumps(row, default=json_default, ensure_ascii=False) + '\n')
+            out.flush()
+            os.fsync(out.fileno())
+
+
+def archive_table(table_name, time_column, cutoff, archive_dir, extra=None,
+                  batch_size=1000, pause=0.05, max_batches=None):
+    """cutoff 이전 행을 날짜별 아카이브에 기록 후 배치 단위로 삭제 - 아카이브한 행 수 반환
+
+    배치마다 짧은 트랜잭션(오래된 순 조회 → 아카이브 기록 → id로 삭제)으로 처리하고 배치 사이에 쉬어
+    운영 중인 테이블을 오래 잠그지 않는다. 기록 후 삭제 전에 중단되면 다음 실행에서 같은 행이
+    다시 기록될 수 있다 (id로 중복 제거 가능).
+    """
+    table = db.metadata.tables[table_name]
+    timestamp = table.c[time_column]
+    conditions = [timestamp < cutoff]
+    if extra is not None:
+        conditions.append(table.c[extra[0]] == extra[1])
+
+    archived = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with db.engine.begin() as conn:
+            lift_statement_timeout(conn)
+            rows = conn.execute(
+                select(table).where(*conditions).order_by(timestamp, table.c.id).limit(batch_size)
+            ).mappings().all()
+            if not rows:
+                break
+            rows = [dict(row) for row in rows]
+            _append_partitions(archive_dir, table_name, time_column, rows)
+            conn.execute(table.delete().where(table.c.id.in_([row['id'] for row in rows])))
+
+        archived += len(rows)
+        batches += 1
+        if len(rows) < batch_size:
+            break
+        time.sleep(pause)
+
+    return archived
+
+
+def apply_retention(config, now=None):
+    """모든 정책 적용 - {테이블: 아카이브한 행 수}"""
+    now = now or datetime.utcnow()
+    archive_dir = config.get('ARCHIVE_DIR', 'archive')
+    results = {}
+    for table_name, time_column, days_key, extra in RETENTION_POLICIES:
+        days = config.get(days_key)
+        if not days:
+            continue  # 0 또는 미설정이면 보관 기간 없음
+        results[table_name] = archive_table(
+            table_name, time_column,
+            cutoff=now - timedelta(days=days),
+            archive_dir=archive_dir,
+            extra=extra,
+            batch_size=config.get('RETENTION_BATCH_SIZE', 1000),
+            pause=config.get('RETENTION_BATCH_PAUSE_MS', 50) / 1000
+        )
+        if results[table_name]:
+            logger.info(f"Archived {results[table_name]} rows from {table_name} (older than {days} days)")
+    return results
+
+
+def retention_horizon(config, table_name, now=None):
+    """원본 행이 온전히 남아 있는 가장 이른 시각 (보관 기간 없으면 None)
+
+    정리 기준 시각이 걸친 시간대는 일부만 남았을 수 있으므로 다음 정시부터로 본다.
+    """
+    for name, _, days_key, _ in RETENTION_POLICIES:
+        if name == table_name and config.get(days_key):
+            cutoff = (now or datetime.utcnow()) - timedelta(days=config[days_key])
+            return cutoff.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    return None
+
+
+def iter_archive(archive_dir, table_name, start_date, end_date, where=None):
+    """아카이브에서 [start_date, end_date] 기간 행 조회 (DB 없이)"""
+    day = start_date
+    while day <= end_date:
+        path = archive_path(archive_dir, table_name, day)
+        if os.path.exists(path):
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    row = json.loads(line)
+                    if where and any(str(row.get(key)).lower() != value.lower() for key, value in where.items()):
+                        continue
+                    yield row
+        day += timedelta(days=1)
+
+
+def archive_stats(archive_dir):
+    """테이블별 아카이브 파티션 수/크기/기간"""
+    stats = {}
+    for table_name, _, _, _ in RETENTION_POLICIES:
+        table_dir = os.path.join(archive_dir, table_name)
+        files = sorted(os.listdir(table_dir)) if os.path.isdir(table_dir) else []
+        stats[table_name] = {
+            'partitions': len(files),
+            'size': sum(os.path.getsize(os.path.join(table_dir, f)) for f in files),
+            'first': files[0].split('.')[0] if files else None,
+            'last': files[-1].split('.')[0] if files else None
+        }
+    return stats
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='아카이브 조회')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    query = subparsers.add_parser('query')
+    query.add_argument('table', choices=[policy[0] for policy in RETENTION_POLICIES])
+    query.add_argument('start', type=date.fromisoformat)
+    query.add_argument('end', type=date.fromisoformat)
+    query.add_argument('--where', action='append', default=[], help='column=value')
+    query.add_argument('--archive-dir', default=os.environ.get('ARCHIVE_DIR', 'archive'))
+    args = parser.parse_args()
+
+    where = dict(condition.split('=', 1) for condition in args.where)
+    for row in iter_archive(args.archive_dir, args.table, args.start, args.end, where):
+        sys.stdout.write(json.dumps(row, ensure_ascii=False) + '\n')
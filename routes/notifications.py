@@ -1,17 +1,23 @@
-from flask import Blueprint, jsonify, request, render_template
+from flask import Blueprint, Response, current_app, jsonify, request, render_template
 from flask_login import login_required, current_user
-from models import db, Notification, NotificationSetting
+from sqlalchemy import and_, or_
+from models import db, Notification, NotificationSetting, notifications_changed, adjust_unread_notifications
+from pagination import encode_cursor, decode_cursor
 from datetime import datetime
 
 bp = Blueprint('notifications', __name__)
 
+# 알림 개수를 모든 템플릿에서 사용할 수 있도록 설정 (관리자 행의 카운터 - 추가 조회 없음)
+@bp.app_context_processor
+def inject_unread_notifications():
+    if current_user.is_authenticated:
+        return {'unread_notifications_count': current_user.unread_notifications or 0}
+    return {'unread_notifications_count': 0}
+
 @bp.route('/notifications')
 @login_required
 def notifications_page():
-    """알림 센터 페이지"""
-    notifications = Notification.query.filter_by(admin_id=current_user.id)\
-        .order_by(Notification.created_at.desc()).all()
-    
+    """알림 센터 페이지 (목록은 /api/notifications로 스크롤하며 불러옴)"""
     # 알림 설정 가져오기
     settings = {}
     notification_settings = NotificationSetting.query.filter_by(admin_id=current_user.id).all()
@@ -19,9 +25,62 @@ def notifications_page():
         settings[setting.type] = setting.to_dict()
     
     return render_template('notifications.html', 
-                         notifications=notifications,
                          settings=settings)
 
+@bp.route('/api/notifications', methods=['GET'])
+@login_required
+def get_notifications():
+    """알림 목록 keyset 페이지 (최신순) - {notifications, next_cursor, has_more}
+
+    필터: type=<유형>, priority=high|normal|low, is_read=true|false
+    """
+    query = Notification.query.filter(Notification.admin_id == current_user.id)
+    
+    type_ = request.args.get('type')
+    if type_:
+        query = query.filter(Notification.type == type_)
+    
+    priority = request.args.get('priority')
+    if priority:
+        query = query.filter(Notification.priority == priority)
+    
+    is_read = request.args.get('is_read')
+    if is_read == 'true':
+        query = query.filter(Notification.is_read == True)
+    elif is_read == 'false':
+        query = query.filter(Notification.is_read == False)
+    
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            last_created_at, last_id = decode_cursor(cursor)
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid cursor.'}), 400
+        query = query.filter(or_(
+            Notification.created_at < last_created_at,
+            and_(Notification.created_at == last_created_at, Notification.id < last_id)
+        ))
+    
+    limit = request.args.get('limit', type=int)
+    limit = min(max(limit or current_app.config['NOTIFICATIONS_PAGE_SIZE'], 1),
+                current_app.config['NOTIFICATIONS_PAGE_MAX'])
+    
+    notifications = query.order_by(Notification.created_at.desc(), Notification.id.desc())\
+        .limit(limit + 1).all()
+    has_more = len(notifications) > limit
+    notifications = notifications[:limit]
+    
+    next_cursor = None
+    if has_more:
+        last = notifications[-1]
+        next_cursor = encode_cursor([last.created_at, last.id])
+    
+    return jsonify({
+        'notifications': [notification.to_dict() for notification in notifications],
+        'next_cursor': next_cursor,
+        'has_more': has_more
+    })
+
 @bp.route('/api/notifications/settings', methods=['POST'])
 @login_required
 def update_notification_settings():
@@ -57,8 +116,12 @@ def mark_notification_read(notification_id):
     if notification.admin_id != current_user.id:
         return jsonify({'error': '권한이 없습니다.'}), 403
     
-    notification.is_read = True
+    # 이미 읽은 알림은 카운터를 건드리지 않음 (동시 요청에도 한 번만 감소)
+    updated = Notification.query.filter_by(id=notification.id, is_read=False)\
+        .update({'is_read': True})
+    adjust_unread_notifications(current_user.id, -updated)
     db.session.commit()
+    notifications_changed.send(Notification, admin_id=current_user.id)
     
     return jsonify({'status': 'success'})
 
@@ -71,8 +134,10 @@ def delete_notification(notification_id):
     if notification.admin_id != current_user.id:
         return jsonify({'error': '권한이 없습니다.'}), 403
     
+    adjust_unread_notifications(current_user.id, 0 if notification.is_read else -1)
     db.session.delete(notification)
     db.session.commit()
+    notifications_changed.send(Notification, admin_id=current_user.id)
     
     return jsonify({'status': 'success'})
 
@@ -80,9 +145,11 @@ def delete_notification(notification_id):
 @login_required
 def mark_all_notifications_read():
     """모든 알림 읽음 표시"""
-    Notification.query.filter_by(admin_id=current_user.id)\
+    updated = Notification.query.filter_by(admin_id=current_user.id, is_read=False)\
         .update({'is_read': True})
+    adjust_unread_notifications(current_user.id, -updated)
     db.session.commit()
+    notifications_changed.send(Notification, admin_id=current_user.id)
     
     return jsonify({'status': 'success'})
 
@@ -90,8 +157,11 @@ def mark_all_notifications_read():
 @login_required
 def clear_all_notifications():
     """모든 알림 삭제"""
+    unread = Notification.query.filter_by(admin_id=current_user.id, is_read=False).delete()
     Notification.query.filter_by(admin_id=current_user.id).delete()
+    adjust_unread_notifications(current_user.id, -unread)
     db.session.commit()
+    notifications_changed.send(Notification, admin_id=current_user.id)
     
     return jsonify({'status': 'success'})
 
@@ -99,9 +169,25 @@ def clear_all_notifications():
 @login_required
 def get_unread_count():
     """읽지 않은 알림 개수"""
-    count = Notification.query.filter_by(
-        admin_id=current_user.id,
-        is_read=False
-    ).count()
-    
-    return jsonify({'count': count}) 
\ No newline at end of file
+    return jsonify({'count': current_user.unread_notifications or 0}) 
+
+@bp.route('/api/notifications/stream')
+@login_required
+def notification_stream():
+    """읽지 않은 개수/새 알림 SSE 스트림 (변경이 있을 때만 전송)
+
+    워커의 스트림 한도가 차면 503 - 브라우저는 Retry-After 뒤에 다시 연결한다.
+    """
+    broker = current_app.extensions['notification_broker']
+    if not broker.acquire():
+        return jsonify({'error': '알림 연결이 많습니다. 잠시 후 다시 연결합니다.'}), 503, \
+            {'Retry-After': str(current_app.config['NOTIFICATION_STREAM_RETRY'])}
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    response = Response(
+        broker.stream(current_user.id, last_event_id),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    # 본문을 시작하기 전에 연결이 끊겨도 닫힐 때 자리 반환
+    response.call_on_close(broker.release)
+    return response
@@ -0,0 +1,260 @@
+from datetime import datetime, timedelta
+import atexit
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import text
+
+from models import db, SchedulerJob
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL advisory lock 키 (마이그레이션 잠금과 구분)
+LEADER_LOCK_KEY = 4120002
+
+
+def latest_slot(frequency, at, now):
+    """now 이전(포함) 가장 최근 예정 시각 - daily / weekly(월요일) / monthly(1일), 로컬 시각 기준"""
+    slot = datetime.combine(now.date(), at)
+    if frequency == 'daily':
+        if slot > now:
+            slot -= timedelta(days=1)
+    elif frequency == 'weekly':
+        slot -= timedelta(days=now.weekday())
+        if slot > now:
+            slot -= timedelta(days=7)
+    elif frequency == 'monthly':
+        slot = slot.replace(day=1)
+        if slot > now:
+            previous_month = slot - timedelta(days=1)
+            slot = slot.replace(year=previous_month.year, month=previous_month.month)
+    else:
+        return None
+    return slot
+
+
+class FileLeaderLock:
+    """같은 서버의 워커 간 리더 잠금 (프로세스가 죽으면 OS가 해제)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        if self._file is not None:
+            return True
+        f = open(self.path, 'a+')
+        try:
+            try:
+                import fcntl
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except ImportError:
+                import msvcrt
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            f.close()
+            return False
+        self._file = f
+        return True
+
+    def is_held(self):
+        return self._file is not None
+
+    def release(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class PostgresLeaderLock:
+    """여러 서버에 걸친 리더 잠금 (세션 advisory lock, 연결이 끊기면 해제)"""
+
+    def __init__(self, engine, key=LEADER_LOCK_KEY):
+        self.engine = engine
+        self.key = key
+        self._conn = None
+
+    def acquire(self):
+        if self._conn is not None:
+            return True
+        conn = self.engine.connect()
+        try:
+            acquired = conn.execute(text('SELECT pg_try_advisory_lock(:key)'), {'key': self.key}).scalar()
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        if not acquired:
+            conn.close()
+            return False
+        self._conn = conn
+        return True
+
+    def is_held(self):
+        if self._conn is None:
+            return False
+        try:
+            self._conn.execute(text('SELECT 1'))
+            self._conn.commit()
+            return True
+        except Exception:
+            # 연결이 끊겼으면 잠금도 풀림
+            self.release()
+            return False
+
+    def release(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+
+class _Job:
+    __slots__ = ('name', 'func', 'interval', 'at', 'frequency')
+
+    def __init__(self, name, func, interval=None, at=None, frequency='daily'):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.at = at
+        self.frequency = frequency
+
+    def is_due(self, last_run, now):
+        if last_run is None:
+            return True
+        if self.interval is not None:
+            return (now - last_run).total_seconds() >= self.interval
+        return last_run < latest_slot(self.frequency, self.at, now)
+
+
+class Scheduler:
+    """워커 간 리더 선출 주기 작업 스케줄러
+
+    모든 워커가 스레드를 띄우지만 리더 잠금을 얻은 한 워커만 작업을 실행한다.
+    리더 워커가 종료되면 잠금이 풀리고 다음 tick에 다른 워커가 이어받는다.
+    작업별 마지막 실행 시각은 SchedulerJob에 기록하므로 리더가 바뀌어도 중복/누락 없이 이어진다.
+    """
+
+    def __init__(self, app=None, tick=30, lock_path='scheduler.lock'):
+        self.app = None
+        self.enabled = True
+        self.tick = tick
+        self.lock_path = lock_path
+        self.lock = None
+        self._jobs = []
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('SCHEDULER_ENABLED', self.enabled)
+        self.tick = app.config.get('SCHEDULER_TICK', self.tick)
+        self.lock_path = app.config.get('SCHEDULER_LOCK_PATH', self.lock_path)
+        # fork(--preload) 이후 워커에서 스레드 재시작
+        app.before_request(self.start)
+        atexit.register(self.shutdown)
+
+    def add_job(self, name, func, interval=None, at=None, frequency='daily'):
+        """interval(초)마다 또는 at(로컬 시각, frequency 주기)마다 func 실행"""
+        self._jobs.append(_Job(name, func, interval=interval, at=at, frequency=frequency))
+
+    def start(self):
+        if not self.enabled:
+            return
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self.lock = None  # 부모 프로세스의 잠금/연결은 사용하지 않음
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='scheduler', daemon=True)
+            self._thread.start()
+
+    def shutdown(self):
+        self._stop.set()
+        if self.lock is not None and self._pid == os.getpid():
+            self.lock.release()
+
+    def is_leader(self):
+        return self.lock is not None and self._pid == os.getpid() and self.lock.is_held()
+
+    def _make_lock(self):
+        with self.app.app_context():
+            if db.engine.dialect.name == 'postgresql':
+                return PostgresLeaderLock(db.engine)
+        return FileLeaderLock(self.lock_path)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.lock is None:
+                    self.lock = self._make_lock()
+                if self.lock.is_held() or self.lock.acquire():
+                    self.run_pending()
+            except Exception as e:
+                logger.error(f"Scheduler tick failed: {str(e)}")
+            self._stop.wait(self.tick)
+
+    def run_pending(self, now=None):
+        """예정 시각이 지난 작업 실행 - 실행한 작업 이름 목록 반환"""
+        ran = []
+        with self.app.app_context():
+            try:
+                now = now or datetime.now()
+                last_runs = {job.name: job.last_run for job in SchedulerJob.query.all()}
+                for job in self._jobs:
+                    if self._stop.is_set():
+                        break
+                    if not job.is_due(last_runs.get(job.name), now):
+                        continue
+                    self._run_job(job)
+                    ran.append(job.name)
+            finally:
+                db.session.remove()
+        return ran
+
+    def _run_job(self, job):
+        started = time.monotonic()
+        started_at = datetime.now()
+        status, error = 'success', None
+        try:
+            job.func()
+        except Exception as e:
+            db.session.rollback()
+            status, error = 'failed', str(e)[:500]
+            logger.error(f"Scheduled job {job.name} failed: {error}")
+
+        record = db.session.get(SchedulerJob, job.name) or SchedulerJob(name=job.name)
+        record.last_run = started_at
+        record.last_status = status
+        record.last_error = error
+        record.duration_ms = int((time.monotonic() - started) * 1000)
+        db.session.add(record)
+        db.session.commit()
+
+    def stats(self):
+        records = {job.name: job for job in SchedulerJob.query.all()}
+        return {
+            'enabled': self.enabled,
+            'leader': self.is_leader(),
+            'pid': os.getpid(),
+            'tick': self.tick,
+            'jobs': [
+                dict(
+                    records[job.name].to_dict() if job.name in records else {'name': job.name},
+                    interval=job.interval,
+                    at=job.at.strftime('%H:%M') if job.at else None
+                )
+                for job in self._jobs
+            ]
+        }
@@ -0,0 +1,194 @@
+from datetime import datetime, timedelta, timezone
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import threading
+import time
+
+from models import db, RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidToken(Exception):
+    """서명/형식/유효 기간/거부 목록 검사 실패 (메시지는 클라이언트 응답용)"""
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _epoch(value):
+    """naive UTC datetime -> epoch 초 (마이크로초까지)"""
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _local_epoch(value):
+    """naive 서버 로컬 시각(Member.expiry_date - 검증 경로는 datetime.now()와 비교) -> epoch 초"""
+    return value.timestamp()
+
+
+def parse_keys(spec, secret_key):
+    """'kid2:secret2,kid1:secret1' -> [(kid, key bytes)] (첫 키로 서명, 나머지는 검증만)
+
+    설정이 없으면 SECRET_KEY에서 파생한 키 하나를 사용한다.
+    """
+    keys = []
+    for item in (spec or '').split(','):
+        if not item.strip():
+            continue
+        kid, _, secret = item.strip().partition(':')
+        if not kid or not secret or '.' in kid:
+            raise ValueError(f'Invalid session token key: {kid or item}')
+        keys.append((kid, secret.encode('utf-8')))
+    if not keys:
+        keys.append(('default', hmac.new(secret_key.encode('utf-8'), b'session-token', hashlib.sha256).digest()))
+    return keys
+
+
+class SessionTokens:
+    """HMAC 서명 세션 토큰 (회원 id, CID, 구독 만료일 포함)
+
+    형식: <kid>.<payload>.<signature> (payload는 base64url JSON)
+    검증은 서명/유효 기간 확인과 메모리 거부 목록 조회뿐이며 DB를 읽지 않는다.
+    키 교체: SESSION_TOKEN_KEYS 맨 앞에 새 키를 추가하고, 유효 기간(SESSION_TOKEN_TTL)이
+    지난 뒤 이전 키를 뺀다. 거부 목록은 RevokedToken 테이블을 deny_refresh초마다 다시 읽어
+    다른 워커의 폐기도 반영한다 (같은 워커의 폐기는 즉시).
+    """
+
+    def __init__(self, app=None, ttl=900, deny_refresh=10):
+        self.ttl = ttl
+        self.deny_refresh = deny_refresh
+        self._keys = {}
+        self._signing_kid = None
+        self._denied_jti = set()
+        self._denied_since = {}  # (kind, value) -> 이 시각(epoch) 이전 발급 토큰 거부
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('SESSION_TOKEN_TTL', self.ttl)
+        self.deny_refresh = app.config.get('SESSION_TOKEN_DENY_REFRESH', self.deny_refresh)
+        keys = parse_keys(app.config.get('SESSION_TOKEN_KEYS'), app.config['SECRET_KEY'])
+        self._keys = dict(keys)
+        self._signing_kid = keys[0][0]
+
+    def _sign(self, kid, payload):
+        return hmac.new(self._keys[kid], f'{kid}.{payload}'.encode('ascii'), hashlib.sha256).digest()
+
+    def issue(self, member_id, cid_value, subscription_expiry):
+        """토큰 발급 - (token, 토큰 만료 epoch). 구독 만료가 더 빠르면 그 시각에 만료"""
+        now = time.time()
+        subscription_exp = int(_local_epoch(subscription_expiry))
+        claims = {
+            'm': member_id,
+            'c': cid_value,
+            'x': subscription_exp,
+            # 발급 시각은 마이크로초까지 - 폐기 직후 다시 로그인해 받은 토큰이 같은 초라는 이유로 거부되지 않도록
+            'i': round(now, 6),
+            'e': min(int(now) + self.ttl, subscription_exp),
+            'j': _b64encode(secrets.token_bytes(12))
+        }
+        kid = self._signing_kid
+        payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode('utf-8'))
+        return f'{kid}.{payload}.{_b64encode(self._sign(kid, payload))}', claims['e']
+
+    def verify(self, token):
+        """토큰 검증 - claims dict 반환, 실패 시 InvalidToken"""
+        try:
+            kid, payload, signature = token.split('.')
+        except (AttributeError, ValueError):
+            raise InvalidToken('Malformed token.')
+        if kid not in self._keys:
+            raise InvalidToken('Unknown token key.')
+        try:
+            valid = hmac.compare_digest(_b64decode(signature), self._sign(kid, payload))
+            claims = json.loads(_b64decode(payload)) if valid else None
+        except ValueError:
+            raise InvalidToken('Malformed token.')
+        if not valid:
+            raise InvalidToken('Invalid token signature.')
+
+        if claims['e'] <= time.time():
+            raise InvalidToken('Token expired.')
+        if self.is_revoked(claims):
+            raise InvalidToken('Token revoked.')
+        return claims
+
+    def is_revoked(self, claims):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.deny_refresh:
+            self.reload()
+        if claims['j'] in self._denied_jti:
+            return True
+        for subject in (('member', str(claims['m'])), ('cid', claims['c'])):
+            since = self._denied_since.get(subject)
+            if since is not None and claims['i'] < since:
+                return True
+        return False
+
+    def reload(self):
+        """아직 유효한 거부 항목 다시 읽기"""
+        rows = db.session.query(RevokedToken.kind, RevokedToken.value, RevokedToken.revoked_at)\
+            .filter(RevokedToken.expires_at > datetime.utcnow()).all()
+        denied_jti = set()
+        denied_since = {}
+        for kind, value, revoked_at in rows:
+            if kind == 'jti':
+                denied_jti.add(value)
+            else:
+                denied_since[(kind, value)] = max(denied_since.get((kind, value), 0), _epoch(revoked_at))
+        with self._lock:
+            self._denied_jti = denied_jti
+            self._denied_since = denied_since
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        """다음 검증에서 거부 목록 다시 읽기"""
+        with self._lock:
+            self._loaded_at = None
+
+    def revoke(self, claims):
+        """토큰 하나 폐기 (토큰 만료 시각까지 유지)"""
+        self._add(RevokedToken(
+            kind='jti',
+            value=claims['j'],
+            expires_at=datetime.utcfromtimestamp(claims['e'])
+        ))
+        with self._lock:
+            self._denied_jti.add(claims['j'])
+
+    def revoke_subject(self, kind, value):
+        """회원('member') 또는 CID('cid')에 지금까지 발급된 토큰 모두 폐기"""
+        now = datetime.utcnow()
+        self._add(RevokedToken(
+            kind=kind,
+            value=str(value),
+            revoked_at=now,
+            expires_at=now + timedelta(seconds=self.ttl)
+        ))
+        with self._lock:
+            self._denied_since[(kind, str(value))] = _epoch(now)
+
+    def _add(self, entry):
+        # 만료된 항목은 폐기 시점에 함께 정리 (폐기는 드물고 토큰 유효 기간이 짧으므로 목록이 작게 유지됨)
+        RevokedToken.query.filter(RevokedToken.expires_at <= datetime.utcnow()).delete(synchronize_session=False)
+        db.session.add(entry)
+        db.session.commit()
+
+    def stats(self):
+        return {
+            'signing_key': self._signing_kid,
+            'keys': list(self._keys),
+            'ttl': self.ttl,
+            'denied_tokens': len(self._denied_jti),
+            'denied_subjects': len(self._denied_since)
+        }
@@ -0,0 +1,109 @@
+from collections import OrderedDict
+import logging
+import threading
+import time
+
+from models import db
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ('value', 'expires_at', 'generated_at')
+
+    def __init__(self, value, ttl):
+        self.value = value
+        self.generated_at = time.time()
+        self.expires_at = time.monotonic() + ttl
+
+
+class SnapshotCache:
+    """통계 스냅샷 캐시 (키별 TTL + single-flight)
+
+    - TTL 안: 저장된 스냅샷 반환
+    - TTL 지남: 기존 스냅샷을 바로 반환하고 백그라운드 스레드에서 갱신
+    - 스냅샷 없음: 첫 요청만 계산하고 같은 키의 동시 요청은 그 결과를 기다림
+    """
+
+    def __init__(self, app=None, ttl=60, max_entries=32, wait_timeout=30):
+        self.app = None
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.ttl = app.config.get('STATS_CACHE_TTL', self.ttl)
+
+    def get(self, key, compute):
+        """key의 스냅샷 반환 - (값, 생성 시각(epoch))"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at <= time.monotonic() and key not in self._inflight:
+                    event = self._inflight[key] = threading.Event()
+                    threading.Thread(
+                        target=self._refresh_in_background,
+                        args=(key, compute, event),
+                        name=f'stats-refresh-{key}',
+                        daemon=True
+                    ).start()
+                return entry.value, entry.generated_at
+
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = self._inflight[key] = threading.Event()
+
+        if owner:
+            try:
+                return self._compute(key, compute)
+            finally:
+                self._finish(key, event)
+
+        # 다른 요청이 계산 중 - 결과를 기다렸다가 사용
+        event.wait(self.wait_timeout)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            return entry.value, entry.generated_at
+        return self._compute(key, compute)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _compute(self, key, compute):
+        value = compute()
+        entry = _Entry(value, self.ttl)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry.value, entry.generated_at
+
+    def _finish(self, key, event):
+        with self._lock:
+            self._inflight.pop(key, None)
+        event.set()
+
+    def _refresh_in_background(self, key, compute, event):
+        try:
+            with self.app.app_context():
+                try:
+                    self._compute(key, compute)
+                finally:
+                    db.session.remove()
+        except Exception as e:
+            logger.error(f"Stats snapshot refresh failed ({key}): {str(e)}")
+        finally:
+            self._finish(key, event)
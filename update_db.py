@@ -1,37 +1,43 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+"""데이터베이스 스키마 업데이트
+
+python update_db.py          # 미적용 마이그레이션 적용
+python update_db.py --check  # 주요 조회가 인덱스를 사용하는지 실행 계획 확인
+"""
 
-import sqlite3
 import os
+import sys
+
+# 스크립트 실행 중에는 주기 작업을 돌리지 않음
+os.environ.setdefault('SCHEDULER_ENABLED', 'false')
 
-# 데이터베이스 파일 경로
-db_path = 'quicker.db'
+from main import app, db
+from migrations import MIGRATIONS, applied_versions, run_migrations, check_index_usage
 
 def update_database():
     """데이터베이스 스키마 업데이트"""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    applied = run_migrations(db.engine)
+    done = applied_versions(db.engine)
     
-    try:
-        # CID 테이블에 last_verified_at 컬럼이 있는지 확인
-        cursor.execute("PRAGMA table_info(CID)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        if 'last_verified_at' not in columns:
-            print("Adding last_verified_at column to CID table...")
-            cursor.execute("ALTER TABLE CID ADD COLUMN last_verified_at DATETIME")
-            print("Successfully added last_verified_at column!")
-        else:
-            print("last_verified_at column already exists.")
-            
-        conn.commit()
-        print("Database update completed!")
-        
-    except Exception as e:
-        print(f"Error updating database: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
+    for version, description, _ in MIGRATIONS:
+        status = 'applied now' if version in applied else ('applied' if version in done else 'pending')
+        print(f"[{version:04d}] {description}: {status}")
+    print("Database update completed!")
+
+def check_indexes():
+    """주요 조회 실행 계획 확인 - 인덱스를 쓰지 않는 조회가 있으면 False"""
+    ok = True
+    for result in check_index_usage(db.engine):
+        mark = 'OK  ' if result['used'] else 'MISS'
+        print(f"{mark} {result['query']} -> {result['index']}")
+        if not result['used']:
+            ok = False
+            print(f"     plan: {result['plan']}")
+    return ok
 
 if __name__ == '__main__':
-    update_database() 
\ No newline at end of file
+    with app.app_context():
+        update_database()
+        if '--check' in sys.argv and not check_indexes():
+            sys.exit(1)
@@ -0,0 +1,160 @@
+from datetime import datetime, timedelta
+import json
+import logging
+import threading
+import time
+
+from sqlalchemy import func, case
+
+from models import db, ApiUsageHourly, Notification, notification_recipients
+
+logger = logging.getLogger(__name__)
+
+WINDOW_MINUTES = 60
+
+
+class UsageMonitor:
+    """API 키별 사용량/오류율 감시 (1시간 슬라이딩 윈도우)
+
+    ApiLogWriter가 기록한 배치를 분 단위 버킷으로 메모리에 집계한다.
+    이 워커의 윈도우가 임계값(워커 수로 나눈 몫)을 넘은 키만 모든 워커가 갱신하는
+    ApiUsageHourly에서 전체 사용량을 확인하므로 요청 경로에서는 DB를 조회하지 않는다.
+    같은 키/유형의 알림은 cooldown 동안 한 번만 생성한다.
+    """
+
+    def __init__(self, app=None, threshold=1000, error_rate=0.2, error_min_calls=20,
+                 cooldown=3600, recheck_interval=60, workers=1):
+        self.threshold = threshold
+        self.error_rate = error_rate
+        self.error_min_calls = error_min_calls
+        self.cooldown = cooldown
+        self.recheck_interval = recheck_interval
+        self.workers = workers
+        self._windows = {}
+        self._last_alert = {}
+        self._last_check = {}
+        self._lock = threading.Lock()
+        self.alerts = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.threshold = app.config.get('API_USAGE_ALERT_THRESHOLD', self.threshold)
+        self.error_rate = app.config.get('API_ERROR_RATE_THRESHOLD', self.error_rate)
+        self.error_min_calls = app.config.get('API_ERROR_MIN_CALLS', self.error_min_calls)
+        self.cooldown = app.config.get('API_ALERT_COOLDOWN', self.cooldown)
+        self.workers = max(app.config.get('WEB_CONCURRENCY', self.workers), 1)
+
+    def observe(self, logs):
+        """로그 배치를 메모리 윈도우에 반영 (DB 접근 없음)"""
+        with self._lock:
+            for log in logs:
+                key_id = log.get('api_key_id')
+                if not key_id:
+                    continue
+                minute = int(log['timestamp'].timestamp() // 60)
+                status_code = log.get('status_code') or 0
+                buckets = self._windows.setdefault(key_id, {})
+                bucket = buckets.setdefault(minute, [0, 0, 0])  # 호출, 오류(4xx/5xx), 서버 오류(5xx)
+                bucket[0] += 1
+                if status_code >= 400:
+                    bucket[1] += 1
+                if status_code >= 500:
+                    bucket[2] += 1
+
+    def window(self, key_id, now=None):
+        """이 워커 기준 최근 1시간 (호출, 오류, 서버 오류)"""
+        oldest = int((now or datetime.utcnow()).timestamp() // 60) - WINDOW_MINUTES + 1
+        with self._lock:
+            buckets = self._windows.get(key_id, {})
+            for minute in [m for m in buckets if m < oldest]:
+                del buckets[minute]
+            totals = [0, 0, 0]
+            for bucket in buckets.values():
+                for i in range(3):
+                    totals[i] += bucket[i]
+        return tuple(totals)
+
+    def process(self, logs):
+        """배치 반영 후 임계값을 넘은 키만 확인/알림"""
+        self.observe(logs)
+        now = datetime.utcnow()
+        for key_id in {log.get('api_key_id') for log in logs if log.get('api_key_id')}:
+            calls, errors, server_errors = self.window(key_id, now)
+            if calls * self.workers > self.threshold:
+                self._check_usage(key_id, now)
+            if calls >= self.error_min_calls and errors / calls >= self.error_rate:
+                self._alert(
+                    key_id, 'error',
+                    title='API 오류율 경고',
+                    message=f'API 키의 오류 응답 비율이 높습니다. (최근 1시간: {calls}회 중 {errors}회 오류)',
+                    priority='high' if server_errors else 'normal'
+                )
+
+    def _check_usage(self, key_id, now):
+        # 전체 워커 사용량 확인은 키당 recheck_interval에 한 번만
+        checked_at = self._last_check.get(key_id)
+        if checked_at is not None and time.monotonic() - checked_at < self.recheck_interval:
+            return
+        self._last_check[key_id] = time.monotonic()
+
+        calls = self.global_calls(key_id, now)
+        if calls > self.threshold:
+            self._alert(
+                key_id, 'api_usage',
+                title='API 사용량 경고',
+                message=f'API 키의 시간당 사용량이 임계값을 초과했습니다. (최근 1시간: {calls}회)',
+                priority='high'
+            )
+
+    def global_calls(self, key_id, now=None):
+        """모든 워커의 최근 1시간 호출 수 추정 (시간 단위 집계 기반 슬라이딩 윈도우)"""
+        now = now or datetime.utcnow()
+        current_hour = ApiUsageHourly.truncate_hour(now)
+        previous_hour = current_hour - timedelta(hours=1)
+        rows = db.session.query(
+            ApiUsageHourly.hour,
+            func.sum(ApiUsageHourly.count)
+        ).filter(
+            ApiUsageHourly.api_key_id == key_id,
+            ApiUsageHourly.hour >= previous_hour
+        ).group_by(ApiUsageHourly.hour).all()
+        counts = {hour: count for hour, count in rows}
+        elapsed = (now - current_hour).total_seconds() / 3600
+        return int(counts.get(current_hour, 0) + counts.get(previous_hour, 0) * (1 - elapsed))
+
+    def _alert(self, key_id, type, title, message, priority):
+        alert_key = (key_id, type)
+        last = self._last_alert.get(alert_key)
+        if last is not None and time.monotonic() - last < self.cooldown:
+            return
+        self._last_alert[alert_key] = time.monotonic()
+
+        # 다른 워커가 이미 보낸 알림이 있으면 생략
+        data = json.dumps({'api_key_id': key_id})
+        recent = Notification.query.filter(
+            Notification.type == type,
+            Notification.data == data,
+            Notification.created_at >= datetime.utcnow() - timedelta(seconds=self.cooldown)
+        ).first()
+        if recent:
+            return
+
+        for admin_id in notification_recipients():
+            Notification.create(
+                admin_id=admin_id,
+                type=type,
+                title=title,
+                message=message,
+                priority=priority,
+                data={'api_key_id': key_id}
+            )
+        self.alerts += 1
+
+    def stats(self):
+        with self._lock:
+            keys = list(self._windows)
+        return {
+            'keys': {key_id: dict(zip(('calls', 'errors', 'server_errors'), self.window(key_id))) for key_id in keys},
+            'alerts': self.alerts
+        }
@@ -0,0 +1,75 @@
+from collections import OrderedDict, namedtuple
+import threading
+import time
+
+# CID 검증에 필요한 최소 정보 (회원 미등록 CID는 None으로 캐시)
+VerificationRecord = namedtuple('VerificationRecord', ['is_active', 'expiry_date', 'name', 'phone'])
+
+# 캐시에 항목이 없을 때 get()이 반환하는 값 (None은 '미등록 CID' 캐시값)
+MISS = object()
+
+
+class VerificationCache:
+    """cid_value -> VerificationRecord 워커 단위 LRU + TTL 캐시
+
+    gunicorn 워커마다 별도 인스턴스가 생기므로 다른 워커의 변경은
+    TTL이 지나야 반영된다. 같은 워커의 회원/CID 변경은 invalidate로 즉시 반영.
+    """
+
+    def __init__(self, max_size=10000, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, cid_value, default=MISS):
+        """캐시 조회 - 없거나 만료되었으면 default 반환"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(cid_value)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._data[cid_value]
+                self.misses += 1
+                return default
+            self._data.move_to_end(cid_value)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, cid_value, record):
+        with self._lock:
+            self._data[cid_value] = (time.monotonic() + self.ttl, record)
+            self._data.move_to_end(cid_value)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *cid_values):
+        """주어진 CID 항목 제거"""
+        with self._lock:
+            for cid_value in cid_values:
+                if self._data.pop(cid_value, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0
+            }